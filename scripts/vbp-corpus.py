@@ -0,0 +1,42 @@
+from vsvbp import corpus, generator
+import argparse, os
+
+GENERATORS = {
+    'unif': generator.unif_bin,
+    'correlated': generator.correlated_capacities,
+    'similar': generator.similar,
+}
+
+def run():
+    parser = argparse.ArgumentParser(description="Write a binary corpus of VSVBP instances")
+    parser.add_argument('output', help="The corpus file to write")
+    parser.add_argument('-d', help="A directory containing (only) files in the arc-flow\
+            format. All files are written into the corpus.")
+    parser.add_argument('-g', choices=sorted(GENERATORS.keys()),
+            help="Generate instances with the given generator")
+    parser.add_argument('-n', type=int, default=100, help="Number of generated instances")
+    parser.add_argument('-b', type=int, default=10, help="Number of bins of generated instances")
+    parser.add_argument('-r', type=int, default=2, help="Number of resources of generated instances")
+    parser.add_argument('-m', type=float, default=.8, help="min_fill of generated instances")
+    parser.add_argument('-s', type=int, default=0, help="Seed of the generated campaign")
+    parser.add_argument('-p', type=int, default=1, help="Number of processes used to generate instances")
+
+    args = parser.parse_args()
+    if not (args.d or args.g):
+        parser.error('No action requested, add -d or -g')
+    if args.d and args.g:
+        parser.error('Too many actions requested, add only -d or -g')
+
+    if args.d:
+        if not os.path.isdir(args.d):
+            parser.error('Invalid directory')
+        files = sorted(os.path.join(args.d, f) for f in os.listdir(args.d))
+        n = corpus.arcflow_corpus(args.output, [f for f in files if os.path.isfile(f)])
+    else:
+        insts = generator.campaign(args.n, args.b, args.r, args.m,
+                GENERATORS[args.g], seed=args.s, processes=args.p)
+        n = corpus.write_corpus(args.output, insts)
+    print str(n) + " instances written to " + args.output
+
+if __name__ == "__main__":
+    run()
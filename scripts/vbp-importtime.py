@@ -0,0 +1,39 @@
+from __future__ import print_function
+import argparse, subprocess, sys, time
+
+MODULES = ['vsvbp', 'vsvbp.container', 'vsvbp.heuristics', 'vsvbp.solver',
+           'vsvbp.online', 'vsvbp.benchmark', 'vsvbp.batch']
+HEAVY = ['unittest', 'multiprocessing', 'numpy']
+
+CHECK = "import sys; import %s; print(' '.join(m for m in %r if m in sys.modules))"
+
+
+def import_time(module, runs):
+    """ Return the median time (seconds) taken by a fresh interpreter
+    importing module, and the heavy modules it loaded """
+    times = []
+    loaded = ''
+    for r in xrange(runs):
+        t = time.time()
+        loaded = subprocess.check_output([sys.executable, '-c', CHECK % (module, HEAVY)])
+        times.append(time.time() - t)
+    times.sort()
+    return times[len(times)//2], loaded.strip()
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Measure the import time of the vsvbp modules")
+    parser.add_argument('-n', type=int, default=20, help="Number of runs per module")
+    parser.add_argument('modules', nargs='*', default=MODULES, help="Modules to import")
+    args = parser.parse_args()
+
+    base, loaded = import_time('sys', args.n)
+    template = "{0:20}{1:>12}   {2}"
+    print(template.format("module", "time (ms)", "heavy modules loaded"))
+    print(template.format("(interpreter)", "%.1f" % (1000*base), loaded))
+    for m in args.modules:
+        t, loaded = import_time(m, args.n)
+        print(template.format(m, "+%.1f" % (1000*(t-base)), loaded))
+
+if __name__ == "__main__":
+    run()
@@ -1,5 +1,5 @@
-from vsvbp import container, solver
-import argparse, sys, os, re
+from vsvbp import container, solver, results, service
+import argparse, sys, os, re, time
 
 def parse(inputfile):
     """ Parse a file using format from
@@ -75,6 +75,27 @@ def optim_rec(directory, level=0):
         optim_rec(d, level+1)
 
 
+def solve(filename, items, tbin):
+    """ Return the number of bins found by the solver and record the run """
+    t = time.time()
+    if optimize.client is not None:
+        options = [o for o, on in zip(service.OPTIONS,
+                   [optimize.dp, optimize.ls, optimize.exact]) if on]
+        ret = optimize.client.optimize(items, tbin, options)
+        if "error" in ret:
+            raise RuntimeError(filename + ": " + ret["error"])
+        opt = ret["bins"]
+    else:
+        opt = len(solver.optimize(items, tbin, optimize.dp, optimize.seed,
+            optimize.ls, optimize.exact, restarts=optimize.restarts,
+            processes=optimize.processes, probes=optimize.probes).bins)
+    if optimize.writer is not None:
+        optimize.writer.add(name=filename, heuristic='optimize', num_bins=opt,
+                num_res=len(tbin.capacities), num_items=len(items),
+                packed=1.0, success=True, time=time.time()-t)
+    return opt
+
+
 def optimize(filename, level=0):
     fl = open(filename)
     items, tbin = parse(fl)
@@ -82,7 +103,7 @@ def optimize(filename, level=0):
         fl.close()
         return
 
-    opt = len(solver.optimize(items, tbin, optimize.dp, optimize.seed).bins)
+    opt = solve(filename, items, tbin)
 
     template = "{0:50}{1:10}"
     if level == 0:
@@ -105,6 +126,21 @@ def run():
             optimize all files in all final subdirectories.")
     parser.add_argument('-u', action='store_true', help="If activated, use dot product heuristics")
     parser.add_argument('-s', type=int, help="Set seed to specified value")
+    parser.add_argument('-l', action='store_true', help="If activated, run a local search\
+            when all heuristics fail")
+    parser.add_argument('-e', action='store_true', help="If activated, run the exact search\
+            on small instances")
+    parser.add_argument('-m', type=int, default=0, help="Number of randomized restarts\
+            run when all heuristics fail")
+    parser.add_argument('-p', type=int, default=1, help="Number of processes running\
+            the randomized restarts (0: all cores)")
+    parser.add_argument('-k', type=int, default=1, help="Number of numbers of bins\
+            checked at once, on as many processes")
+    parser.add_argument('-c', help="Send the instances to a solver service (see\
+            vbp-server.py) listening on the given Unix socket or localhost:port.\
+            -s, -m and -p are ignored")
+    parser.add_argument('-o', help="Save all runs (number of bins, running times) into\
+            the given file, in the columnar format of the benchmark results (.npz)")
 
     args = parser.parse_args()
     if not (args.f or args.d):
@@ -120,10 +156,20 @@ def run():
 
     optimize.dp = args.u
     optimize.seed = args.s
+    optimize.ls = args.l
+    optimize.exact = args.e
+    optimize.restarts = args.m
+    optimize.processes = args.p or None
+    optimize.probes = args.k
+    optimize.writer = results.ResultsWriter() if args.o else None
+    optimize.client = None
+    if args.c:
+        host, sep, port = args.c.rpartition(':')
+        optimize.client = service.Client((host, int(port)) if sep else args.c)
 
     if args.f:
         items, tbin = parse(args.f)
-        opt = len(solver.optimize(items, tbin, args.u, args.s).bins)
+        opt = solve(args.f.name, items, tbin)
         template = "{0:50}{1:10}"
         st = args.f.name.split('/').pop()
         print template.format(st, str(opt))
@@ -132,5 +178,8 @@ def run():
     else:
         optim_rec(args.d)
 
+    if args.o:
+        optimize.writer.save(args.o)
+
 if __name__ == "__main__":
     run()
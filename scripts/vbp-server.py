@@ -0,0 +1,39 @@
+from vsvbp import service
+import argparse
+
+def run():
+    parser = argparse.ArgumentParser(description="Run a VSVBP solver service\
+            (see vsvbp/service.py for the protocol)")
+    parser.add_argument('-u', help="Listen on the given Unix socket")
+    parser.add_argument('-p', type=int, help="Listen on the given localhost TCP port")
+    parser.add_argument('-j', type=int, help="Number of worker processes (default: all cores)")
+    parser.add_argument('-b', type=int, default=32, help="Max number of requests\
+            dispatched to the workers in one batch")
+    parser.add_argument('-d', type=float, default=.005, help="Time (seconds) waited\
+            for requests to add to a batch")
+    parser.add_argument('-t', type=float, default=service.TIMEOUT, help="Time\
+            (seconds) a batch may run before its requests fail")
+    parser.add_argument('-m', type=int, default=service.MAX_PAYLOAD, help="Largest\
+            payload (bytes) of a request")
+
+    args = parser.parse_args()
+    if not (args.u or args.p):
+        parser.error('No address given, add -u or -p')
+    if args.u and args.p:
+        parser.error('Too many addresses given, add only -u or -p')
+
+    address = args.u if args.u else ('localhost', args.p)
+    server = service.make_server(address, args.j, args.b, args.d, args.t,
+                                 args.m)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close_server(server)
+        if args.u:
+            import os
+            os.remove(args.u)
+
+if __name__ == "__main__":
+    run()
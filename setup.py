@@ -10,7 +10,9 @@ setup(
     author='Michael Gabay',
     author_email='',
     packages=['vsvbp'],
+    test_suite='tests',
     include_package_data=True,
+    extras_require={'vectorized': ['numpy']},
     scripts=['bin/vsvbp-benchmark'],
     url='',
     license='GPL',
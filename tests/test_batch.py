@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+
+from vsvbp.container import *
+from vsvbp.batch import *
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        from vsvbp.vgenerator import generator
+        self.instances = generator(30, 6, 3, .8, seed=0)
+        # Remove a bin from half of the instances to get failures
+        for inst in self.instances[::2]:
+            inst.capacities = inst.capacities[1:]
+        self.instances.append(ArrayInstance(np.array([[1,2]]), np.array([[3,3]])))
+        self.batch = stack(self.instances)
+
+    def testStack(self):
+        b = self.batch
+        assert len(b) == 31
+        assert b.requirements.shape[2] == 3
+        assert b.capacities.shape[1:] == (6, 3)
+        assert list(b.num_bins[:3]) == [5, 6, 5]
+        assert b.capacities[-1].tolist() == [[3,3,0]] + [[0,0,0]]*5
+        assert b.item_mask.sum() == b.num_items.sum()
+        assert not b.bin_mask[0, 5] and b.bin_mask[1, 5]
+        assert stack([([Item([1,2])], Bin([2,2]))]).num_bins.tolist() == [1]
+
+    def testHeuristic(self):
+        from vsvbp import heuristics, measures
+        ms = {"1/C": (measures.staticItemsOneOverC, measures.staticBinsOneOverC),
+              "1/R": (measures.staticItemsOneOverR, measures.staticBinsOneOverR),
+              "R/C": (measures.staticItemsROverC, measures.staticBinsROverC),
+              "ic_dyn_1/C": (measures.dynamicItemsOneOverC, measures.dynamicBinsOneOverC),
+              "ic_dyn_1/R": (measures.dynamicItemsOneOverR, measures.dynamicBinsOneOverR),
+              "ic_dyn_R/C": (measures.dynamicItemsROverC, measures.dynamicBinsROverC)}
+        failures = 0
+        for name in PORTFOLIO:
+            assign = bfd_item_centric(self.batch, name)
+            for k, a in enumerate(self.instances):
+                inst = a.to_instance()
+                failed = heuristics.bfd_item_centric(inst.items, inst.bins[:], *ms[name])
+                failed = sorted(inst.items.index(i) for r, i in failed)
+                ret = [i for i in xrange(len(inst.items)) if assign[k, i] < 0]
+                assert ret == failed
+                failures += len(failed) > 0
+                for j, b in enumerate(inst.bins):
+                    assert sorted(inst.items.index(i) for i in b.items) == \
+                           [i for i in xrange(len(inst.items)) if assign[k, i] == j]
+        assert failures > 0
+
+    def testSolve(self):
+        names, assign = solve(self.batch)
+        assert names[5] == "1/C" and names[-1] == "1/C"
+        assert names[21] == "ic_dyn_1/C"
+        assert (names == None).any()
+        assert (is_feasible(self.batch) == (names != None)).all()
+        packings = unstack(self.batch, assign)
+        for k in np.flatnonzero(names != None):
+            caps = self.batch.capacities[k]
+            reqs = self.batch.requirements[k]
+            assert sum(len(p) for p in packings[k]) == self.batch.num_items[k]
+            for b, p in enumerate(packings[k]):
+                assert (reqs[p].sum(axis=0) <= caps[b]).all()
+        assert packings[-1] == [[0]]
+
+
+if __name__ == "__main__":
+    unittest.main()
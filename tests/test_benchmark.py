@@ -0,0 +1,42 @@
+import unittest
+
+from vsvbp.container import *
+from vsvbp.benchmark import *
+import vsvbp.benchmark as bench # module globals (the star import shadows it)
+
+
+class StreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.args = ('correlated', 4, 2, .7, .8)
+        self.insts = list(instance_stream(*self.args, num_instances=3, seed=1))
+
+    def tearDown(self):
+        bench.results = [0]*bench.NUM_HEUR
+
+    def testStream(self):
+        assert len(self.insts) == 3
+        for inst in self.insts:
+            assert len(inst.bins) == 4 and len(inst.bins[0].capacities) == 2
+        again = instance_stream(*self.args, num_instances=3, seed=1)
+        assert [str(i) for i in again] == [str(i) for i in self.insts]
+
+    def testUniform(self):
+        # With rate 0, the rare resource is never available
+        for inst in instance_stream('unif-rare', 4, 2, .7, .8, rate=0.,
+                                    num_instances=3):
+            assert [b.capacities[-1] for b in inst.bins] == [0]*4
+
+    def testStats(self):
+        import StringIO
+        stats = run_pr(*self.args, num_instances=3, seed=1)
+        assert stats.count == 3
+        assert str(stats) == repr_instance(self.insts)
+        bench.instance_file = StringIO.StringIO()
+        print_res(stats)
+        line = bench.instance_file.getvalue()
+        assert line.startswith(repr_instance(self.insts))
+        assert line.count(';') == 5 + 2*bench.NUM_HEUR
+
+
+if __name__ == "__main__":
+    unittest.main()
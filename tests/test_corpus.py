@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+
+from vsvbp.container import *
+from vsvbp.corpus import *
+
+
+class CorpusTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.mkdtemp()
+        self.file = self.dir + "/test.vbpc"
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.dir)
+
+    def testWriteRead(self):
+        i1 = Instance([Item([1,2]), Item([3,4]), Item([0,1])], [Bin([5,5]), Bin([6,7])])
+        i2 = ArrayInstance(np.array([[1,2,3]]), np.array([[4,5,6]]))
+        i3 = ([Item([2,2])]*2, Bin([3,3]))
+        i4 = Instance([], [Bin([1,1])])
+        assert write_corpus(self.file, iter([i1, i2, i3, i4])) == 4
+
+        c = Corpus(self.file)
+        assert len(c) == 4
+        assert c[0].requirements.tolist() == [[1,2],[3,4],[0,1]]
+        assert c[0].capacities.tolist() == [[5,5],[6,7]]
+        assert c[1].requirements.tolist() == [[1,2,3]]
+        assert c[-2].requirements.tolist() == [[2,2],[2,2]]
+        assert c[2].capacities.tolist() == [[3,3]]
+        assert c[3].requirements.shape == (0, 2)
+        assert isinstance(c[0].requirements.base, np.memmap)
+        self.assertRaises(IndexError, c.__getitem__, 4)
+        inst = c[0].to_instance()
+        assert str(inst) == str(i1)
+        assert len(list(c)) == 4
+
+    def testArcflow(self):
+        fn = self.dir + "/inst.txt"
+        with open(fn, 'w') as f:
+            f.write("2\n10 20\n2\n1 2 3\n4 5 1\n")
+        inst = read_arcflow(fn)
+        assert inst.requirements.tolist() == [[1,2]]*3 + [[4,5]]
+        assert inst.capacities.tolist() == [[10,20]]
+        assert arcflow_corpus(self.file, [fn, fn]) == 2
+        c = Corpus(self.file)
+        assert c[1].requirements.tolist() == [[1,2]]*3 + [[4,5]]
+
+    def testEmpty(self):
+        assert write_corpus(self.file, []) == 0
+        assert len(Corpus(self.file)) == 0
+
+    def testBadFile(self):
+        with open(self.file, 'wb') as f:
+            f.write(b"x"*HEADER_SIZE)
+        self.assertRaises(ValueError, Corpus, self.file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from vsvbp.container import *
+from vsvbp.exact import *
+
+
+class BranchAndBoundTestCase(unittest.TestCase):
+    def setUp(self):
+        self.items = [Item([2,3]), Item([2,2]), Item([4,0]), Item([0,5])]
+        self.tbin = Bin([4,5])
+
+    def testFeasible(self):
+        status, bins = branch_and_bound(self.items, self.tbin, 2)
+        assert status
+        assert len(bins) == 2
+        assert sorted(i for b in bins for i in b.items) == sorted(self.items)
+        for b in bins:
+            assert min(b.remaining) >= 0
+
+    def testInfeasible(self):
+        assert branch_and_bound(self.items, self.tbin, 1) == (False, None)
+        items = [Item([3,3]) for i in xrange(3)]
+        assert branch_and_bound(items, Bin([5,5]), 2) == (False, None)
+        assert branch_and_bound(items, Bin([5,5]), 3)[0]
+
+    def testEmpty(self):
+        status, bins = branch_and_bound([], self.tbin, 2)
+        assert status and len(bins) == 2
+
+    def testNodeLimit(self):
+        items = [Item([3,3]) for i in xrange(9)]
+        assert branch_and_bound(items, Bin([5,5]), 8, max_nodes=5) == (None, None)
+        assert branch_and_bound(items, Bin([5,5]), 8) == (False, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
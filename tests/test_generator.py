@@ -0,0 +1,52 @@
+import unittest
+import random
+
+from vsvbp.container import *
+from vsvbp.generator import *
+
+
+class ItemBinTestCase(unittest.TestCase):
+    def setUp(self):
+        self.i1 = Item([1,2,9]); self.i2 = Item([4,5,3])
+        self.i3 = Item([0,1,0]); self.i4 = Item([9,8,7])
+        self.i1.size = 1; self.i2.size = 2; self.i3.size = 3; self.i4.size = 0;
+        self.items = [self.i4, self.i3, self.i2, self.i1]
+        self.b1=Bin([5,8,4]); self.b2=Bin([100,0,100]); self.b3=Bin([1,2,9]);
+        self.b1.size=1; self.b2.size=2; self.b3.size=3;
+        self.bins = [self.b1,self.b2,self.b3]
+        self.ins = Instance(self.items, self.bins)
+
+    def testInstance(self):
+        assert str(self.ins)=="Items:\n"+str(self.items)+"\nBins:\n"+str(self.bins)
+
+    def testGenerator(self):
+        iss=generator(2,2,.5,seed=0)
+        assert iss.items[1].requirements==[356, 197]
+        assert iss.bins[1].capacities == [516,411]
+
+    def testRng(self):
+        i1 = generator(3, 2, .8, correlated_capacities, rng=random.Random(4),
+                       correlated_items=True)
+        i2 = generator(3, 2, .8, correlated_capacities, rng=random.Random(4),
+                       correlated_items=True)
+        assert str(i1) == str(i2)
+        i1 = generator(3, 2, .8, similar, rng=random.Random(4))
+        i2 = generator(3, 2, .8, similar, rng=random.Random(5))
+        assert str(i1) != str(i2)
+
+    def testCampaign(self):
+        assert instance_seed(0, 1) == instance_seed(0, 1)
+        assert instance_seed(0, 1) != instance_seed(1, 0)
+        c1 = campaign(6, 3, 2, .8, seed=7)
+        c2 = campaign(6, 3, 2, .8, seed=7, processes=2)
+        assert len(c1) == 6
+        assert [str(i) for i in c1] == [str(i) for i in c2]
+        i3 = generator(3, 2, .8, rng=instance_rng(7, 3))
+        assert str(c1[3]) == str(i3)
+        c3 = campaign(2, 3, 2, .8, similar_items, seed=7, processes=2,
+                      base_item=Item([50,50]))
+        assert len(c3) == 2 and len(c3[0].bins) == 3
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+
+from vsvbp.container import *
+from vsvbp.measures import *
+from vsvbp.heuristics import *
+from vsvbp.preprocess import compatibility_masks
+
+
+class HeuristicsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.i1 = Item([1,2,9]); self.i2 = Item([4,5,3])
+        self.i3 = Item([0,1,0]); self.i4 = Item([9,8,7])
+        self.i1.size = 1; self.i2.size = 2; self.i3.size = 3; self.i4.size = 0; 
+        self.items = [self.i4, self.i3, self.i2, self.i1]
+        self.b1=Bin([5,8,4]); self.b2=Bin([100,0,100]); self.b3=Bin([1,2,9]);
+        self.b1.size=1; self.b2.size=2; self.b3.size=3; 
+        self.bins = [self.b1,self.b2,self.b3]
+
+
+    def testItemCentricSuccess(self):
+        ret = bfd_item_centric(self.items[1:], self.bins, do_nothing, do_nothing)
+        assert ret == []
+        
+    def testItemCentricFailure(self):
+        ret = bfd_item_centric(self.items, self.bins, do_nothing, do_nothing)
+        assert self.b3.items == [self.i1]
+        assert self.b2.items == []
+        assert self.b1.items == [self.i3,self.i2]
+        assert ret == [(3,self.i4)]
+        
+    def testBinCentricSuccess(self):
+        ret = bfd_bin_centric(self.items[1:], self.bins, do_nothing, do_nothing)
+        assert ret == []
+        
+    def testBinCentricFailure(self):
+        ret = bfd_bin_centric(self.items, self.bins, do_nothing, do_nothing)
+        assert self.b3.items == [self.i1]
+        assert self.b2.items == []
+        assert self.b1.items == [self.i3,self.i2]
+        assert ret == [(3,self.i4)]
+        
+    def testFailure(self):
+        self.i4.size = 10; 
+        ret = bfd_item_centric(self.items, self.bins, do_nothing, do_nothing)
+        assert self.b3.items == [self.i1]
+        assert self.b2.items == []
+        assert self.b1.items == [self.i3,self.i2]
+        assert ret == [(0,self.i4)]
+        self.setUp(); self.i4.size = 10; 
+        ret = bfd_bin_centric(self.items, self.bins, do_nothing, do_nothing)
+        assert self.b3.items == [self.i1]
+        assert self.b2.items == []
+        assert self.b1.items == [self.i3,self.i2]
+        assert ret == [(3,self.i4)]
+        
+    def testFailFast(self):
+        assert overloaded(self.items, self.bins)
+        assert not overloaded(self.items[1:], self.bins)
+        ret = bfd_item_centric(self.items, self.bins, do_nothing, do_nothing,
+                               fail_fast=True)
+        assert ret == list(enumerate(self.items))
+        assert all(not b.items for b in self.bins)
+        assert bfd_item_centric(self.items[1:], self.bins, do_nothing, do_nothing,
+                                fail_fast=True) == []
+        self.setUp()
+        assert bfd_bin_centric(self.items[1:], self.bins, do_nothing, do_nothing,
+                               fail_fast=True) == []
+
+        a = Item([4,0]); b = Item([4,0]); c = Item([0,1])
+        a.size = 2; b.size = 1; c.size = 0
+        for h in (bfd_item_centric, bin_balancing):
+            b1 = Bin([5,5]); b2 = Bin([3,5])
+            ret = h([a, b, c], [b1, b2], do_nothing, do_nothing, fail_fast=True)
+            assert ret == [(1,b), (2,c)]
+            assert b1.items == [a]
+        b1 = Bin([5,5]); b2 = Bin([3,5]); b1.size = 1; b2.size = 2
+        ret = bfd_bin_centric([a, b, c], [b1, b2], do_nothing, do_nothing,
+                              fail_fast=True)
+        assert ret == [(2,b)]
+        assert b1.items == [a, c]
+
+    def testSteps(self):
+        steps = list(bfd_item_centric_steps(self.items[1:], self.bins,
+                                            do_nothing, do_nothing))
+        assert steps == [[]]*4
+        self.setUp()
+        steps = bin_balancing_steps(self.items, self.bins, do_nothing, do_nothing)
+        assert [len(f) for f in steps] == [0, 0, 0, 1, 1]
+        self.setUp()
+        steps = list(bfd_bin_centric_steps(self.items, self.bins, do_nothing,
+                                           do_nothing))
+        assert len(steps) == 4 and steps[-1] == [(3,self.i4)]
+        assert STEPS[bin_balancing] is bin_balancing_steps
+
+    def testPresorted(self):
+        for h in (bfd_item_centric, bin_balancing):
+            for m in STATIC_ITEM_MEASURES:
+                self.setUp()
+                ret = h(self.items[1:], self.bins[:], m, staticBinsOneOverC)
+                packing = str(self.bins)
+                self.setUp()
+                order = static_order(self.items[1:], self.bins, m)
+                assert str(h(order, self.bins[:], m, staticBinsOneOverC,
+                             presorted=True)) == str(ret)
+                assert str(self.bins) == packing
+
+    def testBinClasses(self):
+        bins = [Bin([2,2]), Bin([5,5]), Bin([2,2]), Bin([5,5])]
+        classes = bin_classes(bins)
+        assert [classes[id(b)] for b in bins] == [0, 1, 0, 1]
+        for h in (bfd_item_centric, bin_balancing):
+            for b in bins: b.empty()
+            items = [Item([3,3]), Item([1,1]), Item([4,4])]
+            items[0].size = 2; items[1].size = 1; items[2].size = 3
+            assert h(items, bins[:], do_nothing, do_nothing) == []
+            assert sorted(len(b.items) for b in bins) == [0, 1, 1, 1]
+            assert not bins[0].items or not bins[2].items
+
+    def testCompatibility(self):
+        bins = [Bin([5,5,0]), Bin([5,5,0]), Bin([5,5,5])]
+        items = [Item([2,2,2]), Item([3,3,0]), Item([1,1,4])]
+        items[0].size = 3; items[1].size = 2; items[2].size = 1
+        compat = compatibility_masks(items, bins)
+        for h, kwargs in ((bfd_item_centric, {}), (bin_balancing, {}),
+                          (bin_balancing, {'single': True}),
+                          (bfd_item_centric, {'compat': compat}),
+                          (bin_balancing, {'compat': compat})):
+            for b in bins: b.empty()
+            assert h(items, bins[:], do_nothing, do_nothing, **kwargs) == \
+                [(2, items[2])]
+            assert bins[0].items == [items[1]]
+            assert bins[2].items == [items[0]]
+        assert [b.items for b in bin_groups(bins, compat[0])[1][1]] == \
+            [[items[1]], []]
+
+    def testOriginalBinBalancing(self):
+        self.i2.requirements=[1,1,1]
+        ret = bin_balancing(self.items, self.bins, do_nothing, do_nothing, False)
+        assert self.b1.items == [self.i3]
+        assert self.b2.items == []
+        assert self.b3.items == [self.i2]
+        assert ret == [(2,self.i1),(3,self.i4)]    
+        
+    def testSingleBinBalancing(self):
+        self.i2.requirements=[1,1,1]
+        ret = bin_balancing(self.items, self.bins, do_nothing, do_nothing, True)
+        assert self.b1.items == [self.i3]
+        assert self.b2.items == []
+        assert self.b3.items == [self.i2]
+        assert ret == [(2,self.i1),(3,self.i4)] 
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import random
+
+from vsvbp.container import *
+from vsvbp.index import *
+
+
+class ResidualIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.b1 = Bin([10,2]); self.b2 = Bin([3,8]); self.b3 = Bin([6,6])
+        self.index = ResidualIndex([self.b1, self.b2, self.b3])
+
+    def testQueries(self):
+        assert len(self.index) == 3 and self.b2 in self.index
+        assert self.index.candidates([7,0]) == [self.b1]
+        assert self.index.feasible(Item([4,2])) == [self.b3, self.b1]
+        assert self.index.feasible(Item([7,7])) == []
+        assert self.index.best(Item([1,1]), lambda b: b.remaining[1]) == self.b1
+        assert self.index.best(Item([7,7]), lambda b: 0) is None
+        assert ResidualIndex().feasible(Item([1,1])) == []
+
+    def testUpdates(self):
+        self.b3.insert(Item([5,1]))
+        self.index.update(self.b3)
+        assert self.index.feasible(Item([2,3])) == [self.b2]
+        self.index.remove(self.b2)
+        assert self.b2 not in self.index
+        assert self.index.feasible(Item([2,3])) == []
+        self.index.add(self.b2)
+        assert self.index.feasible(Item([1,1])) == [self.b3, self.b2, self.b1]
+
+    def testRandom(self):
+        rng = random.Random(0)
+        bins = [Bin([rng.randint(1,20) for r in xrange(3)]) for k in xrange(50)]
+        index = ResidualIndex(bins)
+        for k in xrange(200):
+            item = Item([rng.randint(0,8) for r in xrange(3)])
+            feasible = [b for b in bins if b.feasible(item)]
+            assert sorted(map(id, index.feasible(item))) == sorted(map(id, feasible))
+            if feasible:
+                b = rng.choice(feasible)
+                b.insert(item)
+                index.update(b)
+
+
+class ItemIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.i1 = Item([1,9]); self.i2 = Item([5,5]); self.i3 = Item([8,2])
+        self.index = ItemIndex([self.i1, self.i2, self.i3])
+
+    def testQueries(self):
+        b = Bin([6,6])
+        assert len(self.index) == 3 and self.i1 in self.index
+        assert self.index.candidates([6,6]) == [self.i1, self.i2]
+        assert self.index.feasible(b) == [self.i2]
+        b.insert(Item([2,2]))
+        assert self.index.feasible(b) == []
+        assert self.index.candidates([0,0]) == []
+        self.index.remove(self.i2)
+        assert self.i2 not in self.index
+        assert self.index.candidates([10,10]) == [self.i1, self.i3]
+        assert ItemIndex().candidates([1,1]) == []
+
+
+if __name__ == "__main__":
+    unittest.main()
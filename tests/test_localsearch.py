@@ -0,0 +1,54 @@
+import unittest
+
+from vsvbp.container import *
+from vsvbp.localsearch import *
+
+
+class LocalSearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.b1 = Bin([10,10]); self.b2 = Bin([10,10])
+        self.i1 = Item([6,2]); self.i2 = Item([3,3])
+        self.i3 = Item([6,6]); self.i4 = Item([4,4])
+        self.bins = [self.b1, self.b2]
+
+    def testFits(self):
+        self.b1.insert(self.i3)
+        assert not fits(self.i3, self.b1)
+        assert fits(self.i3, self.b1, self.i3)
+        assert fits(self.i2, self.b1)
+        assert first_fit(self.i4, self.bins) == self.b1
+        assert first_fit(self.i4, self.bins, exclude=self.b1) == self.b2
+
+    def testNothingToDo(self):
+        assert local_search(self.bins, []) == []
+        assert local_search([], [(0, self.i1)]) == [(0, self.i1)]
+
+    def testMove(self):
+        # i3 fits in b1 once i4 has been moved to b2
+        self.b1.insert(self.i4); self.b1.insert(self.i2)
+        self.b2.insert(self.i1)
+        assert local_search(self.bins, [(3, self.i3)]) == []
+        assert self.b1.items == [self.i2, self.i3]
+        assert self.b2.items == [self.i1, self.i4]
+        assert self.b1.remaining == [1,1] and self.b2.remaining == [0,4]
+
+    def testSwap(self):
+        # i3 is swapped with i4, which is swapped with i2
+        self.b1.insert(self.i4); self.b1.insert(self.i2)
+        self.b2.insert(Item([9,9]))
+        ret = local_search(self.bins, [(2, self.i3)])
+        assert ret == [(0, self.i2)]
+        assert self.b1.items == [self.i3, self.i4]
+        assert self.b1.remaining == [0,0] and self.b2.remaining == [1,1]
+
+    def testFailure(self):
+        big = Item([11,0])
+        self.b1.insert(self.i3)
+        ret = local_search(self.bins, [(1, self.i4), (2, big)])
+        assert ret == [(0, big)]
+        assert self.b1.items == [self.i3, self.i4]
+        assert self.b1.remaining == [0,0] and self.b2.remaining == [10,10]
+
+
+if __name__ == "__main__":
+    unittest.main()
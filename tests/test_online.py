@@ -0,0 +1,119 @@
+import unittest
+
+from vsvbp.container import *
+from vsvbp.online import *
+
+
+class OnlinePackerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.b1 = Bin([10,10]); self.b2 = Bin([10,10]); self.b3 = Bin([4,20])
+        self.b1.insert(Item([6,6]))
+        self.bins = [self.b1, self.b2, self.b3]
+
+    def testBestFit(self):
+        p = OnlinePacker(self.bins, "1/C")
+        assert p.place(Item([3,3])) == self.b1
+        assert p.place(Item([3,3])) == self.b3
+        assert p.place(Item([5,5])) == self.b2
+        assert p.place(Item([1,11])) == self.b3
+        assert p.place(Item([11,0])) is None
+        assert self.b3.remaining == [0,6]
+        assert p._bins == sortl(self.bins[:], dec=False)
+
+    def testIndexed(self):
+        import random
+        rng = random.Random(0)
+        for m in ["1/C", "R/C", "dp_normC"]:
+            caps = [[rng.randint(5,20) for r in xrange(3)] for k in xrange(30)]
+            bins = [[Bin(c) for c in caps] for x in xrange(2)]
+            packers = [OnlinePacker(bins[0], m), OnlinePacker(bins[1], m, True)]
+            placed = []
+            for k in xrange(150):
+                req = [rng.randint(0,6) for r in xrange(3)]
+                items = [Item(req), Item(req)]
+                ret = [p.place(i) for p, i in zip(packers, items)]
+                assert [b and bs.index(b) for b, bs in zip(ret, bins)] == \
+                       [ret[0] and bins[0].index(ret[0])]*2
+                if ret[0]: placed.append(items)
+                if k % 10 == 9:
+                    for items in placed[:5]:
+                        for p, i in zip(packers, items): p.remove(i)
+                    del placed[:5]
+            assert len(packers[1].residuals) == 30
+
+    def testEmpty(self):
+        p = OnlinePacker([], "R/C", True)
+        assert p.weights == [] and p.place(Item([1,1])) is None
+        p.add_bin(self.b3)
+        assert p.weights != [] and p.place(Item([1,1])) == self.b3
+        p.add_bin(self.b2)
+        assert p.place(Item([9,9])) == self.b2 and len(p.residuals) == 2
+
+    def testZeroItem(self):
+        p = OnlinePacker(self.bins, "dp_normR")
+        assert p.place(Item([0,0])) is not None
+        assert p.place(Item([3,3])) is not None
+
+    def testBatch(self):
+        p = OnlinePacker(self.bins, "1/R")
+        i1 = Item([9,9]); i2 = Item([4,4]); i3 = Item([5,0])
+        ret = p.place_batch([i3, i2, i1])
+        assert self.b2.items == [i1]
+        assert self.b1.items[1:] == [i2]
+        assert ret == [(2, i3)]
+        assert p.place_batch([]) == []
+
+    def testDotProduct(self):
+        p = OnlinePacker(self.bins, "dp_normR")
+        assert p.place(Item([1,5])) == self.b3
+        assert p.place(Item([3,3])) in [self.b1, self.b2]
+        assert p.place(Item([20,0])) is None
+
+    def testAddBin(self):
+        p = OnlinePacker(self.bins, "R/C")
+        b = Bin([1,1])
+        p.add_bin(b)
+        assert p.place(Item([1,1])) == b
+        assert b.remaining == [0,0]
+
+    def testSizesChanged(self):
+        # Bins are removed from the index with the size they were indexed with
+        p = OnlinePacker(self.bins, "1/C")
+        for b in self.bins: b.size = 100
+        assert p.place(Item([3,3])) == self.b1
+        assert p._sizes == sorted(p._sizes) and len(p._bins) == 3
+        assert p.remove(self.b1.items[1]) == self.b1
+        assert self.b1 in p._bins and len(p._bins) == 3
+
+    def testDepart(self):
+        p = OnlinePacker(self.bins, "1/C")
+        i1 = Item([3,3]); i2 = Item([1,10])
+        p.place(i1); p.place(i2)
+        assert p.location[i1] == self.b1 and p.location[i2] == self.b3
+        assert p.depart([i1, i2]) == [self.b1, self.b3]
+        assert self.b1.remaining == [4,4]
+        assert self.b3.remaining == [4,20]
+        assert p._bins == sortl(self.bins[:], dec=False)
+        self.assertRaises(KeyError, p.remove, i1)
+
+    def testConsolidate(self):
+        p = OnlinePacker(self.bins, "1/C")
+        i0 = self.b1.items[0]
+        i1 = Item([2,2]); i2 = Item([1,15]); i3 = Item([9,9])
+        assert p.place_batch([i1, i2, i3]) == []
+        assert self.b2.items == [i3] and self.b3.items == [i2, i1]
+        # b1 cannot be emptied: it is left unchanged
+        assert p.consolidate(threshold=.7) == []
+        assert self.b1.items == [i0] and self.b3.items == [i2, i1]
+        assert p._bins == sortl(self.bins[:], dec=False)
+
+        affected = p.depart([i2])
+        assert p.consolidate(affected) == [self.b3]
+        assert self.b3.items == [] and self.b3.remaining == [4,20]
+        assert self.b1.items == [i0, i1] and p.location[i1] == self.b1
+        assert p._bins == sortl(self.bins[:], dec=False)
+        assert p.place(Item([3,3])) == self.b3
+
+
+if __name__ == "__main__":
+    unittest.main()
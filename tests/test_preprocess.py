@@ -0,0 +1,71 @@
+import unittest
+
+from vsvbp.container import *
+from vsvbp.preprocess import *
+
+
+class CompatibilityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.items = [Item([2,0,3]), Item([1,4,0]), Item([5,5,0])]
+        self.bins = [Bin([10,10,0]), Bin([10,3,10]), Bin([10,10,10])]
+
+    def testMasks(self):
+        assert resource_mask([0,2,0,1]) == 10
+        masks = compatibility(self.items, self.bins)
+        assert [masks[id(b)] for b in self.bins] == [4, 2, 0]
+        needs = item_masks(self.items, masks)
+        assert [needs[id(i)] for i in self.items] == [5, 3, 3]
+        assert compatibility(self.items[1:], self.bins[2:]) is None
+        assert compatibility([], self.bins) is None
+        assert item_masks(self.items, None) is None
+        assert compatibility_masks(self.items, self.bins) == (masks, needs)
+        assert compatibility_masks(self.items[1:], self.bins[2:]) == (None, None)
+
+
+class ReductionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.items = [Item([9,1,0]), Item([2,1,0]), Item([0,0,0]),
+                      Item([3,2,1]), Item([4,1,1]), Item([0,3,0])]
+        self.tbin = Bin([10,10,10])
+
+    def testReduce(self):
+        assert binding_resources(self.items, [10,10,10], [0,1,2]) == [0]
+        assert alone(self.items[:2], [10,10,10], [0]) == self.items[:2]
+        assert alone(self.items[:3], [10,10,10], [0]) == []
+        red = Reduction(self.items, self.tbin)
+        # Once items[0] is fixed, the others fit into a single bin
+        assert red.fixed == [self.items[0]] and red.resources == []
+        assert red.free == [self.items[k] for k in [2, 5, 1, 3, 4]]
+        assert red.items == [] and red.unpackable == []
+        sol = red.restore(Instance([], []))
+        assert sol.items == self.items
+        assert [len(b.items) for b in sol.bins] == [3, 3]
+        assert Reduction(self.items, Bin([8,10,10])).unpackable == [self.items[0]]
+
+    def testRestore(self):
+        items = [Item([6,0]), Item([5,0]), Item([5,0]), Item([1,1]), Item([1,0])]
+        red = Reduction(items, Bin([10,10]))
+        assert red.resources == [0] and red.tbin.capacities == [10]
+        assert [i.requirements for i in red.items] == [[6], [5], [5], [1], [1]]
+        bins = [Bin([10]), Bin([10])]
+        for b, k in zip([0, 1, 1, 0, 0], range(5)):
+            bins[b].insert(red.items[k])
+        sol = red.restore(Instance(red.items, bins))
+        assert [b.items for b in sol.bins] == [[items[0]] + items[3:], items[1:3]]
+        assert sol.bins[0].remaining == [2, 9]
+        assert red.restore(None) is None
+
+    def testPairs(self):
+        items = [Item([8,1]), Item([2,1]), Item([5,1]), Item([5,1]), Item([3,1])]
+        assert pairs(items, [10,10], [0]) == [(items[0], items[1])]
+        red = Reduction(items, Bin([10,10]))
+        assert red.pairs == [(items[0], items[1])] and red.fixed == []
+        assert [i.requirements for i in red.items] == [[5], [5], [3]]
+        b1, b2 = Bin([10]), Bin([10])
+        b1.insert(red.items[0]); b1.insert(red.items[2]); b2.insert(red.items[1])
+        sol = red.restore(Instance(red.items, [b1, b2]))
+        assert [b.items for b in sol.bins] == [[items[2], items[4]], [items[3]],
+                                               items[:2]]
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from vsvbp.results import *
+
+
+class ResultsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.w = ResultsWriter()
+        for i in xrange(3):
+            for h, packed in [("1/C", 1.), ("1/R", .5)]:
+                self.w.add(instance=i, heuristic=h, instance_type='unif',
+                           num_bins=10, num_res=2, num_items=10+i, usage=.5,
+                           max_usage=.6+i/10., packed=packed,
+                           success=packed==1., time=.01)
+        self.w.add(instance=3, heuristic="1/C", instance_type='unif',
+                   num_bins=30, num_res=2, num_items=30, usage=.8,
+                   max_usage=.9, packed=1., success=True)
+
+    def testWriter(self):
+        assert len(self.w) == 7
+        assert self.w.columns['name'] == [''] * 7
+        self.assertRaises(ValueError, self.w.add, foo=1)
+
+    def testSummary(self):
+        header, lines = summarize(self.w.columns)
+        assert header.endswith('1/C_pn;1/C_ns;1/R_pn;1/R_ns;')
+        assert len(lines) == 2
+        assert lines[0].startswith('10;2;11;0.5;')
+        assert lines[0].endswith(';1.0;3;0.5;0;')
+        assert lines[1] == '30;2;30;0.8;0.9;1.0;1;;;'
+        header, lines = summarize(ResultsWriter().columns)
+        assert header.endswith('max % usage;') and lines == []
+
+    def testSaveLoad(self):
+        import tempfile, shutil
+        d = tempfile.mkdtemp()
+        try:
+            self.w.save(d + "/res.npz")
+            res = load_results(d + "/res.npz")
+            assert res['packed'].dtype.kind == 'f'
+            assert res['success'].dtype.kind == 'b'
+            assert list(res['heuristic'][:2]) == ["1/C", "1/R"]
+            assert summarize(res) == summarize(self.w.columns)
+            write_summary(res, d + "/res.csv")
+            assert len(open(d + "/res.csv").readlines()) == 3
+        finally:
+            shutil.rmtree(d)
+
+
+if __name__ == "__main__":
+    unittest.main()
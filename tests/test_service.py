@@ -0,0 +1,86 @@
+import unittest
+import threading
+import json
+
+from vsvbp.container import *
+from vsvbp.service import *
+
+
+class ServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.dir = tempfile.mkdtemp()
+        self.server = make_server(self.dir + "/vbp.sock", processes=2, delay=.05)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.text = "2\n10 10\n3\n5 5 3\n4 2 2\n1 8 1\n"
+
+    def tearDown(self):
+        import shutil
+        self.server.shutdown()
+        self.thread.join()
+        close_server(self.server)
+        shutil.rmtree(self.dir)
+
+    def testFormats(self):
+        reqs, cap = parse_arcflow(self.text)
+        assert cap == [10, 10]
+        assert reqs == [[5,5]]*3 + [[4,2]]*2 + [[1,8]]
+        assert parse_binary(pack_binary(reqs, cap)) == (reqs, cap)
+        self.assertRaises(ValueError, parse_arcflow, "2\n10 10\n2\n5 5 3\n")
+        self.assertRaises(ValueError, parse_binary, pack_binary(reqs, cap)[:-1])
+
+    def testRequests(self):
+        c = Client(self.dir + "/vbp.sock")
+        try:
+            ret = c.optimize_arcflow(self.text)
+            assert ret["bins"] == 3
+            assert sorted(i for b in ret["packing"] for i in b) == range(6)
+            items = [Item([3,3]) for i in xrange(3)]
+            ret = c.optimize(items, Bin([5,5]), ["ls"])
+            assert ret["bins"] == 3 and "time" in ret
+            assert "error" in c.request("arcflow", b"2\n")
+            assert "error" in c.request("foo", b"")
+            assert "error" in c.request("binary", b"", ["bar"])
+            assert c.optimize_arcflow(self.text)["bins"] == 3
+            ret = c.optimize([Item([6,1])], Bin([5,5]))
+            assert ret["bins"] is None and ret["packing"] is None
+            # Bad lengths are rejected before reading a payload
+            for length in (-1, self.server.max_payload + 1):
+                c.file.write(("arcflow %d\n" % length).encode('ascii'))
+                c.file.flush()
+                ret = json.loads(c.file.readline().decode('ascii'))
+                assert ret == {"error": "invalid request: bad length"}
+            assert c.optimize_arcflow(self.text)["bins"] == 3
+        finally:
+            c.close()
+
+    def testBatches(self):
+        responses = []
+        def run():
+            c = Client(self.dir + "/vbp.sock")
+            responses.append(c.optimize_arcflow(self.text))
+            c.close()
+        threads = [threading.Thread(target=run) for k in xrange(8)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        assert [r["bins"] for r in responses] == [3]*8
+        assert self.server.dispatcher.batches < 8
+
+    def testTimeout(self):
+        import multiprocessing
+        class Result:
+            def __init__(self, error):
+                self.error = error
+            def get(self, timeout):
+                raise self.error
+        dispatcher = self.server.dispatcher
+        for error, message in [(multiprocessing.TimeoutError(), "timeout"),
+                               (ValueError("bad"), "ValueError: bad")]:
+            jobs = [Job(None), Job(None)]
+            dispatcher.wait(jobs, Result(error))
+            assert [j.wait() for j in jobs] == [{"error": message}]*2
+
+
+if __name__ == "__main__":
+    unittest.main()
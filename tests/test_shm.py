@@ -0,0 +1,45 @@
+import unittest
+import os
+
+from vsvbp.shm import *
+
+
+def size_of(name):
+    reqs, caps = attach(name)
+    return len(reqs), len(caps)
+
+
+class SharedMemoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.reqs = [[1,2,3], [4,5,6]]
+        self.caps = [[10,10,10]]
+
+    def testEncode(self):
+        assert decode(encode(self.reqs, self.caps)) == (self.reqs, self.caps)
+        assert decode(encode([], [[1,2]])) == ([], [[1,2]])
+        for reqs, code in (([[1,-2**31]], 'i'), ([[1,2**31]], 'l'),
+                           ([[1,.5]], 'd'), ([[1,2**64]], 'p')):
+            assert typecode(reqs[0]) == code
+            assert decode(encode(reqs, [[10,10]])) == (reqs, [[10,10]])
+
+    def testSharedInstance(self):
+        shared = SharedInstance(self.reqs, self.caps)
+        try:
+            assert attach(shared.name) == (self.reqs, self.caps)
+            assert attach(shared.name) is attach(shared.name)
+            assert load(shared.name) == (self.reqs, self.caps)
+            assert load((self.reqs, [])) == (self.reqs, [])
+            import multiprocessing
+            pool = multiprocessing.Pool(2)
+            try:
+                assert pool.map(size_of, [shared.name]*4) == [(2, 1)]*4
+            finally:
+                pool.terminate()
+        finally:
+            shared.unlink()
+        if not shared.name.startswith(PREFIX):
+            assert not os.path.exists(shared.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import unittest
+import random
+import multiprocessing
+
+from vsvbp.container import *
+from vsvbp.solver import *
+
+
+class OptimizationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.items = [Item([0,4,3]), Item([1,1,3]), Item([5,2,1]), Item([3,1,7])]
+        self.bins = [Bin([5,5,8]), Bin([8,5,9]), Bin([3,3,5])]
+
+    def testFeasible(self):
+        bins = [Bin(self.bins[0].capacities) for i in xrange(5)]
+        inst = Instance(self.items[:], bins)
+        assert is_feasible(inst, True)
+
+        bins = [Bin(self.bins[0].capacities) for i in xrange(2)]
+        inst = Instance(self.items[:], bins)
+        assert not is_feasible(inst, True)
+
+        # Warning: this test may fail if the heuristics perform poorly
+        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
+        inst = Instance(self.items[:], bins)
+        assert is_feasible(inst, True)
+
+        bins = [Bin(self.bins[2].capacities) for i in xrange(15)]
+        inst = Instance(self.items[:], bins)
+        assert not is_feasible(inst, True)
+
+
+    def testOptimize(self):
+        # Warning: these tests may fail if the heuristics perform poorly
+        assert len(optimize(self.items, self.bins[0], True).bins) == 3
+        assert len(optimize(self.items, self.bins[1], True).bins) == 2
+        assert optimize(self.items, self.bins[2], True) == None
+
+    def testOrders(self):
+        orders = {}
+        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
+        inst = Instance(self.items[:], bins)
+        assert solve(inst, first="1/R", orders=orders) == "1/R"
+        assert orders.keys() == [staticItemsOneOverR]
+        assert sorted(orders[staticItemsOneOverR]) == sorted(self.items)
+        assert solve(inst, first="bb_st_1/C", orders=orders) == "bb_st_1/C"
+        assert len(orders) == 2
+
+    def testRace(self):
+        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
+        inst = Instance(self.items[:], bins)
+        name, progress = race(inst, steps=1)
+        assert name == "nothing"
+        assert sum(len(b.items) for b in inst.bins) == 4
+        for b in inst.bins:
+            assert min(b.remaining) >= 0
+        assert [i.size for i in self.items] == [0]*4
+
+        bins = [Bin(self.bins[0].capacities) for i in xrange(2)]
+        inst = Instance(self.items[:], bins)
+        name, progress = race(inst, portfolio(True))
+        assert name is None
+        assert sorted(progress) == sorted(h[0] for h in portfolio(True))
+        assert sum(len(b.items) for b in inst.bins) == 0
+        assert not is_feasible(inst, True, racing=True)
+        assert len(optimize(self.items, self.bins[0], True, racing=True).bins) == 3
+        assert len(optimize(self.items, self.bins[1], racing=True).bins) == 2
+
+    def testProbes(self):
+        assert probe_points(3, 4, 3) == [3, 4]
+        assert probe_points(0, 99, 3) == [25, 50, 75]
+        assert probe_points(10, 14, 1) == [12]
+        cache = FeasibilityCache()
+        assert len(optimize(self.items, self.bins[0], True, probes=3,
+                            cache=cache).bins) == 3
+        entry = cache.entry(self.items, self.bins[0])
+        assert entry.best == 3 and entry.max_fail(cache_options(True)) == 2
+        assert len(optimize(self.items, self.bins[1], probes=2).bins) == 2
+        assert optimize(self.items, self.bins[2], probes=2) == None
+        source = ([i.requirements for i in self.items], [self.bins[0].capacities])
+        k, name, packing = probe((source, 3, 0, False, False, None, 0, False))
+        assert k == 3 and name is not None
+        assert sorted(sum(packing, [])) == range(4)
+
+    def testExact(self):
+        # All heuristics fail with 6 bins
+        reqs = [[6,9], [9,3], [3,11], [5,5], [12,7], [11,7], [9,4], [9,11],
+                [8,10], [9,3], [10,8], [6,3], [11,7], [10,11]]
+        items = [Item(r) for r in reqs]
+        tbin = Bin([20,20])
+        random.seed(0)
+        assert len(optimize(items, tbin).bins) == 7
+        sol = optimize(items, tbin, exact=True)
+        assert len(sol.bins) == 6
+        assert sum(len(b.items) for b in sol.bins) == len(reqs)
+        for b in sol.bins:
+            assert min(b.remaining) >= 0
+
+    def testPortfolio(self):
+        names = [h[0] for h in portfolio(True)]
+        assert len(names) == len(set(names)) == 34
+        assert names[:2] == ["nothing", "shuff1"] and names[-1] == "dp_normR"
+        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
+        inst = Instance(self.items[:], bins)
+        assert solve(inst) == "nothing"
+        assert solve(inst, first="bb_st_1/C") == "bb_st_1/C"
+        bins = [Bin(self.bins[0].capacities) for i in xrange(2)]
+        assert solve(Instance(self.items[:], bins)) is None
+        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
+        assert solve(inst, first="sbb_shuff", rng=random.Random(0)) == "sbb_shuff"
+
+    def testReduction(self):
+        items = [Item([9,1,0]), Item([2,1,0]), Item([0,0,0]), Item([3,2,1]),
+                 Item([4,1,1]), Item([0,3,0])]
+        ret = optimize(items, Bin([10,10,10]), reduction=True)
+        assert len(ret.bins) == 2 and ret.items == items
+        assert sorted(i for b in ret.bins for i in b.items) == sorted(items)
+        for b in ret.bins:
+            assert min(b.remaining) >= 0
+        assert optimize(items, Bin([8,10,10]), reduction=True) is None
+        assert len(optimize(items[2:3], Bin([1,1,1]), reduction=True).bins) == 1
+
+    def testCache(self):
+        cache = FeasibilityCache()
+        ret = optimize(self.items, self.bins[0], cache=cache)
+        assert len(ret.bins) == 3
+        entry = cache.entry(self.items[::-1], self.bins[0])
+        assert len(cache) == 1
+        assert entry.best == 3 and entry.max_fail() == 2
+        assert entry.lookup(4) and entry.lookup(1) == False
+        # Failures only hold for the options of the run which failed
+        ls = cache_options(use_ls=True)
+        assert entry.lookup(2, ls) is None
+        entry.record(2, None, options=ls)
+        assert entry.lookup(2, ls) == False and entry.max_fail() == 2
+        assert entry.lookup(3, ls)
+        # Solutions are rebuilt from the cache
+        items = [Item(i.requirements) for i in self.items]
+        ret = optimize(items, self.bins[0], cache=cache)
+        assert len(ret.bins) == 3
+        assert sorted(i for b in ret.bins for i in b.items) == sorted(items)
+        sol = entry.solution(items, self.bins[0], 5)
+        assert len(sol.bins) == 5
+        assert sum(len(b.items) for b in sol.bins) == 4
+        for b in sol.bins:
+            assert min(b.remaining) >= 0
+        assert optimize(self.items, self.bins[2], cache=cache) == None
+        assert len(cache) == 2
+
+    def testCacheSize(self):
+        cache = FeasibilityCache(2)
+        entries = [cache.entry(self.items[:k], self.bins[0]) for k in (1, 2)]
+        assert cache.entry(self.items[:1], self.bins[0]) is entries[0]
+        cache.entry(self.items[:3], self.bins[0])
+        assert len(cache) == 2
+        assert cache.entry(self.items[:1], self.bins[0]) is entries[0]
+        assert cache.entry(self.items[:2], self.bins[0]) is not entries[1]
+
+    def testMultiStart(self):
+        names = [h[0] for h in randomized_portfolio()]
+        assert names == ["shuff1", "ic_shuff", "bb_shuff1", "bb_shuff",
+                         "sbb_shuff1", "sbb_shuff"]
+        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
+        inst = Instance(self.items[:], bins)
+        assert multi_start(inst, 4, seed=1).startswith("ms_")
+        assert sum(len(b.items) for b in inst.bins) == 4
+        for b in inst.bins:
+            assert min(b.remaining) >= 0
+        bins = [Bin(self.bins[0].capacities) for i in xrange(2)]
+        inst = Instance(self.items[:], bins)
+        pool = multiprocessing.Pool(2)
+        try:
+            assert multi_start(inst, 4, seed=1, pool=pool) is None
+        finally:
+            pool.terminate()
+        # No restart is left running after the first success
+        items = [Item([3,3]) for k in xrange(30)]
+        inst = Instance(items, [Bin([10,10]) for k in xrange(10)])
+        pool = multiprocessing.Pool(2)
+        try:
+            assert multi_start(inst, 3000, seed=1, pool=pool, processes=2) is not None
+            ret = pool.apply_async(len, ([],))
+            ret.wait(.5)
+            assert ret.ready()
+        finally:
+            pool.terminate()
+        assert len(optimize(self.items, self.bins[0], restarts=4,
+                            processes=2).bins) == 3
+
+    def testSharedValues(self):
+        # Probes and pooled restarts on floats and integers above 2**31
+        for scale in (.5, 2**31, 2**60):
+            items = [Item([x*scale for x in i.requirements]) for i in self.items]
+            tbin = Bin([x*scale for x in self.bins[0].capacities])
+            assert len(optimize(items, tbin, probes=2).bins) == 3
+            inst = Instance(items, [Bin(tbin.capacities) for k in xrange(4)])
+            pool = multiprocessing.Pool(2)
+            try:
+                assert multi_start(inst, 4, seed=1, pool=pool) is not None
+            finally:
+                pool.terminate()
+
+    def testLocalSearch(self):
+        # All heuristics fail on this instance, local search succeeds
+        reqs = [[45,22], [300,304], [1,88], [83,143], [285,176], [190,103],
+                [256,294], [22,260], [112,28], [90,3], [189,45], [17,182],
+                [416,320], [156,3], [176,324], [132,77]]
+        caps = [[781,338], [734,841], [511,459], [610,907]]
+        inst = Instance([Item(r) for r in reqs], [Bin(c) for c in caps])
+        random.seed(0)
+        assert not is_feasible(inst)
+        inst = Instance([Item(r) for r in reqs], [Bin(c) for c in caps])
+        random.seed(0)
+        assert is_feasible(inst, use_ls=True)
+        assert sum(len(b.items) for b in inst.bins) == len(reqs)
+        for b in inst.bins:
+            assert min(b.remaining) >= 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+
+from vsvbp.container import *
+from vsvbp.vgenerator import *
+
+
+class VGeneratorTestCase(unittest.TestCase):
+    def check(self, instances, num_instances, num_bins, num_resources):
+        assert len(instances) == num_instances
+        for inst in instances:
+            assert inst.capacities.shape == (num_bins, num_resources)
+            assert inst.requirements.shape[1] == num_resources
+            assert (inst.requirements >= 0).all()
+            assert (inst.requirements.max(axis=1) > 0).all()
+            # total requirements never exceed total capacities
+            assert (inst.requirements.sum(axis=0) <= inst.capacities.sum(axis=0)).all()
+
+    def testGenerators(self):
+        self.check(generator(20, 10, 3, .8, seed=0), 20, 10, 3)
+        self.check(generator(20, 10, 3, .8, unif_bin, seed=0, rem_cons=.8,
+                   proc_rate=.25), 20, 10, 3)
+        self.check(generator(20, 5, 2, .8, correlated_capacities, seed=0,
+                   dev=.1), 20, 5, 2)
+        self.check(generator(20, 5, 2, .8, correlated_capacities, seed=0,
+                   dev=.1, correlated_items=True), 20, 5, 2)
+        self.check(generator(20, 5, 4, .7, similar, seed=0, dev=.2), 20, 5, 4)
+        self.check(generator(20, 5, 3, .7, similar_items, seed=0,
+                   base_item=Item([50,50,50]), dev=.15), 20, 5, 3)
+
+    def testRareResource(self):
+        insts = generator(50, 10, 3, .8, unif_bin, seed=1, proc_rate=.25)
+        caps = np.concatenate([i.capacities for i in insts])
+        assert 0 < (caps[:, -1] == 0).mean() < 1
+
+    def testFill(self):
+        # Items are packed in their bins in the generated solution
+        rng = np.random.RandomState(0)
+        cap, req, owner = unif_bin(rng, 100, 3, .9)
+        used = np.zeros_like(cap)
+        np.add.at(used, owner, req)
+        assert (used <= cap).all()
+        vol = (used / cap.astype(float)).mean(axis=1)
+        assert (vol > .5).mean() > .9
+
+    def testSeed(self):
+        i1 = generator(5, 10, 2, .8, seed=3)
+        i2 = generator(5, 10, 2, .8, seed=3)
+        for a, b in zip(i1, i2):
+            assert (a.requirements == b.requirements).all()
+            assert (a.capacities == b.capacities).all()
+        inst = i1[0].to_instance()
+        assert len(inst.items) == len(i1[0].requirements)
+        assert len(inst.bins) == 10
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,5 @@
-from .benchmark import run_benchmark
+def run_benchmark(*args, **kwargs):
+    """ Run the benchmark (see benchmark.run_benchmark).
+    The benchmark module is only imported when needed """
+    from .benchmark import run_benchmark
+    return run_benchmark(*args, **kwargs)
@@ -0,0 +1,180 @@
+"""
+Batched solving of many small instances (requires numpy)
+
+Instances are stacked into padded 3-D arrays:
+    requirements    shape (#instances, max #items, max #resources)
+    capacities      shape (#instances, max #bins, max #resources)
+Padding items and bins are masked out, padding resources have null
+requirements and capacities.
+
+The item centric best fit heuristic then runs on all instances in lockstep:
+at each step, the next item of every instance is placed with vectorized
+operations. With the static and dynamic 1/C, 1/R and R/C measures, it packs
+each instance exactly as heuristics.bfd_item_centric does.
+"""
+
+import numpy as np
+
+from .container import *
+from .corpus import as_arrays
+
+# Supported heuristics (portfolio names): (weights, dynamic)
+HEURISTICS = {
+    "1/C": ("C", False),
+    "1/R": ("R", False),
+    "R/C": ("R/C", False),
+    "ic_dyn_1/C": ("C", True),
+    "ic_dyn_1/R": ("R", True),
+    "ic_dyn_R/C": ("R/C", True),
+}
+PORTFOLIO = ["1/C", "1/R", "R/C", "ic_dyn_1/C", "ic_dyn_1/R", "ic_dyn_R/C"]
+
+
+################## Batches ####################
+
+class Batch:
+    """ A batch of instances stored in padded arrays """
+    def __init__(self, requirements, capacities, num_items, num_bins):
+        self.requirements = requirements
+        self.capacities = capacities
+        self.num_items = num_items
+        self.num_bins = num_bins
+        self.item_mask = np.arange(requirements.shape[1]) < num_items[:, None]
+        self.bin_mask = np.arange(capacities.shape[1]) < num_bins[:, None]
+
+    def __repr__(self):
+        return "Batch(" + str(len(self)) + " instances)"
+
+    def __len__(self):
+        return len(self.num_items)
+
+    def subset(self, idx):
+        """ Return the batch of instances idx (an array of indices) """
+        return Batch(self.requirements[idx], self.capacities[idx],
+                     self.num_items[idx], self.num_bins[idx])
+
+
+def stack(instances):
+    """ Stack instances (Instance, ArrayInstance or tuples (items, tbin),
+    see corpus.as_arrays) into a Batch """
+    arrays = [as_arrays(inst) for inst in instances]
+    n = len(arrays)
+    ni = np.array([len(r) for r, c in arrays], dtype=np.int64)
+    nb = np.array([len(c) for r, c in arrays], dtype=np.int64)
+    nr = max([c.shape[1] for r, c in arrays] or [0])
+    reqs = np.zeros((n, max(ni.max() if n else 0, 1), nr), dtype=np.int64)
+    caps = np.zeros((n, max(nb.max() if n else 0, 1), nr), dtype=np.int64)
+    for k, (r, c) in enumerate(arrays):
+        reqs[k, :len(r), :r.shape[1]] = r
+        caps[k, :len(c), :c.shape[1]] = c
+    return Batch(reqs, caps, ni, nb)
+
+
+################## Measures ####################
+
+def inverse(x):
+    """ Return 1/x, 0 where x is null """
+    return np.where(x != 0, 1. / np.where(x != 0, x, 1), 0.)
+
+def weights(kind, reqs, rem):
+    """ Return the weights (alpha = beta) of the resources of each instance,
+    given the total requirements and remaining capacities (#instances x #resources) """
+    if kind == "C": return inverse(rem)
+    if kind == "R": return inverse(reqs)
+    return np.where(rem != 0, reqs / np.where(rem != 0, rem, 1).astype(float), 0.)
+
+def sizes(w, x):
+    """ Return the sizes of x (#instances x n x #resources) with weights w.
+    Sums are computed resource after resource, like in measures.py """
+    s = np.zeros(x.shape[:2])
+    for j in xrange(x.shape[2]):
+        s += w[:, j, None] * x[:, :, j]
+    return s
+
+
+################## Heuristics ####################
+
+def bfd_item_centric(batch, name="1/C"):
+    """
+    Run the item centric best fit heuristic on all instances of batch,
+    with the measures of the portfolio heuristic name (see HEURISTICS).
+
+    Return an array of shape (#instances, max #items): the bin of each item,
+    -1 for unpacked (and padding) items
+    """
+    kind, dynamic = HEURISTICS[name]
+    n, ni, nr = batch.requirements.shape
+    req = batch.requirements
+    rows = np.arange(n)
+    left = batch.item_mask.copy()
+    rem = batch.capacities.copy()
+    assign = np.empty((n, ni), dtype=np.int64)
+    assign.fill(-1)
+
+    def measure(order):
+        # Sizes of the items left and bins list sorted by increasing sizes
+        # (stable sort of the current list, as container.sortl)
+        w = weights(kind, (req * left[:, :, None]).sum(axis=1),
+                    (rem * batch.bin_mask[:, :, None]).sum(axis=1))
+        s = np.where(batch.bin_mask, sizes(w, rem), np.inf)[rows[:, None], order]
+        order = order[rows[:, None], np.argsort(s, axis=1, kind='mergesort')]
+        return np.where(left, sizes(w, req), -np.inf), order
+
+    isize, order = measure(np.tile(np.arange(rem.shape[1]), (n, 1)))
+
+    for t in xrange(batch.num_items.max() if n else 0):
+        if dynamic:
+            isize, order = measure(order)
+        i = np.argmax(np.where(left, isize, -np.inf), axis=1)
+        active = left[rows, i]
+        left[rows, i] = False
+
+        r = req[rows, i]
+        fit = (r[:, None, :] <= rem[rows[:, None], order]).all(axis=2)
+        fit &= batch.bin_mask[rows[:, None], order]
+        packed = active & fit.any(axis=1)
+        b = order[rows, np.argmax(fit, axis=1)][packed]
+        rem[rows[packed], b] -= r[packed]
+        assign[rows[packed], i[packed]] = b
+
+    return assign
+
+
+def solve(batch, heuristics=PORTFOLIO):
+    """ Run the heuristics, in this order, on the instances of batch
+    which are not solved yet.
+    Return the name of the heuristic which found a feasible solution for
+    each instance (None if no solution was found) and the solutions
+    (see bfd_item_centric) """
+    names = np.empty(len(batch), dtype=object)
+    assign = np.empty(batch.requirements.shape[:2], dtype=np.int64)
+    assign.fill(-1)
+    todo = np.arange(len(batch))
+    for name in heuristics:
+        if not len(todo): break
+        sub = batch.subset(todo)
+        ret = bfd_item_centric(sub, name)
+        ok = ((ret >= 0) | ~sub.item_mask).all(axis=1)
+        names[todo[ok]] = name
+        assign[todo[ok]] = ret[ok]
+        todo = todo[~ok]
+    return names, assign
+
+
+def is_feasible(batch, heuristics=PORTFOLIO):
+    """ Return a boolean array: True if a heuristic found a feasible
+    solution of the instance """
+    return solve(batch, heuristics)[0] != None
+
+
+def unstack(batch, assign):
+    """ Return the packings of assign: for each instance, the list of
+    the lists of the items (indices) packed in each bin """
+    ret = []
+    for k in xrange(len(batch)):
+        packing = [[] for b in xrange(batch.num_bins[k])]
+        for i in xrange(batch.num_items[k]):
+            if assign[k, i] >= 0:
+                packing[assign[k, i]].append(i)
+        ret.append(packing)
+    return ret
@@ -9,6 +9,8 @@ from .container import *
 from .heuristics import *
 from .generator import *
 from .measures import *
+from .results import ResultsWriter
+import time
 
 hlist = ["nothing","shuff1","1/C","1/R","R/C",
          "ic_shuff","ic_dyn_1/C","ic_dyn_1/R","ic_dyn_R/C",
@@ -23,11 +25,22 @@ NUM_HEUR = len(hlist)
 rank_t = 0
 results = [0]*NUM_HEUR
 
-def upd(inst,ret):
+writer = None # ResultsWriter recording all runs, if any
+config = {} # generator configuration, recorded with each run
+num_inst = 0 # instance number
+
+def upd(inst,ret,name=None,elapsed=0.0):
     """ Update results
     %packed / #success"""
     global results
     global rank_t
+    if writer is not None:
+        usage, max_usage = instance_usage(inst)
+        writer.add(instance=num_inst, heuristic=name or hlist[rank_t],
+                   num_bins=len(inst.bins), num_res=len(inst.bins[0].capacities),
+                   num_items=len(inst.items), usage=usage, max_usage=max_usage,
+                   packed=float(len(inst.items)-len(ret))/len(inst.items),
+                   success=not ret, time=elapsed, **config)
     dic = results[rank_t]
     if not dic:
         dic = {}
@@ -42,9 +55,9 @@ def upd(inst,ret):
     if not ret:
         dic['n_success'] += 1
 
-def print_res(desc):
+def print_res(stats):
     global results
-    s=repr_instance(desc)
+    s=str(stats)
     for r in results:
         s+=str(r['sp_packed'] / r['total']) + ';' + str(r['n_success']) + ';'
     instance_file.write(s+'\n')
@@ -52,34 +65,61 @@ def print_res(desc):
     results = [0]*NUM_HEUR
 
 
+def instance_usage(inst):
+    """ Return the average and max % usage of an instance """
+    tot = [0.0]*len(inst.bins[0].capacities)
+    req = tot[:]
+    ll = len(req)
+    for i in inst.items:
+        for j, v in enumerate(i.requirements):
+            req[j] += v
+    for i in inst.bins:
+        for j, v in enumerate(i.capacities):
+            tot[j] += v
+    for j, v in enumerate(tot):
+        if v > 0:
+            req[j] /= v
+        else:
+            ll -= 1
+    return sum(req)/ll, max(req)
+
+
+class InstanceStats:
+    """ Instance characteristics, accumulated online:
+    #bins ; #resources; Avg #items ; Avg %usage ; Avg max % usage"""
+    def __init__(self):
+        self.num_bins = 0
+        self.num_res = 0
+        self.count = 0
+        self.ni = 0
+        self.usg = 0.0
+        self.max_usg = 0.0
+
+    def add(self, inst):
+        """ Add an instance to the statistics """
+        if not self.count:
+            self.num_bins = len(inst.bins)
+            self.num_res = len(inst.items[0].requirements)
+        self.count += 1
+        self.ni += len(inst.items)
+        usage, max_usage = instance_usage(inst)
+        self.usg += usage
+        self.max_usg += max_usage
+
+    def __str__(self):
+        s = str(self.num_bins) + ';' + str(self.num_res) +';'
+        s += str(self.ni/self.count)+";"+str(self.usg/self.count)+";"
+        s += str(self.max_usg/self.count)+";"
+        return s
+
+
 def repr_instance(instances):
     """ Print instance characteristics
     #bins ; #resources; Avg #items ; Avg %usage ; Avg max % usage"""
-    inst = instances[0]
-    s = str(len(inst.bins)) + ';' + str(len(inst.items[0].requirements)) +';'
-
-    ni = 0; usg = 0; max_usg = 0
+    stats = InstanceStats()
     for inst in instances:
-        ni += len(inst.items)
-        tot = [0.0]*len(inst.bins[0].capacities)
-        req = tot[:]
-        ll = len(req)
-        for i in inst.items:
-            for j, v in enumerate(i.requirements):
-                req[j] += v
-        for i in inst.bins:
-            for j, v in enumerate(i.capacities):
-                tot[j] += v
-        for j, v in enumerate(tot):
-            if v > 0:
-                req[j] /= v
-            else:
-                ll -= 1
-        usg += sum(req)/ll
-        max_usg += max(req)
-
-    s+= str(ni/len(instances))+";"+str(usg/len(instances))+";"+str(max_usg/len(instances))+";"
-    return s
+        stats.add(inst)
+    return str(stats)
 
 
 def open_files(suffix=''):
@@ -113,7 +153,7 @@ def run_benchmark():
 def benchmark(num_bins=[10,30,100], num_res=[2,5,10],
         instance_type='correlated', num_instances=100,
         min_fill=.7, rem_cons=.8, correlated_items=False,
-        dev=.2, rt=1., use_dp=False):
+        dev=.2, rt=1., use_dp=False, vectorized=False, results_file=None):
     """
     Runs the benchmark for all combinations of given
     numbers of bins and resources and on the given number of instances.
@@ -145,6 +185,11 @@ def benchmark(num_bins=[10,30,100], num_res=[2,5,10],
             implementation of dot products heuristics is very unefficient
             so the computing time will be significantly increased if they
             are used.
+        vectorized -- if True, instances are generated all at once
+            by the vectorized generators (requires numpy).
+        results_file -- if set, all runs (one row per instance and
+            heuristic, with their running times) are saved in this file
+            (see results.py, requires numpy).
     """
 
     assert instance_type in ['unif','unif-rare','correlated','similar']
@@ -152,9 +197,14 @@ def benchmark(num_bins=[10,30,100], num_res=[2,5,10],
     if use_dp:
         hlist.extend(dplist)
 
-    global NUM_HEUR, results
+    global NUM_HEUR, results, writer, config
     NUM_HEUR = len(hlist)
     results = [0]*NUM_HEUR
+    if results_file:
+        writer = ResultsWriter()
+        config = dict(instance_type=instance_type, min_fill=min_fill,
+                rem_cons=rem_cons, dev=dev, rate=rt,
+                correlated_items=correlated_items)
 
     if instance_type == 'unif':
         rt=1.
@@ -171,162 +221,87 @@ def benchmark(num_bins=[10,30,100], num_res=[2,5,10],
 
     for b in num_bins:
         for r in num_res:
-            inst = run_pr(instance_type, b, r, min_fill, rem_cons,
+            stats = run_pr(instance_type, b, r, min_fill, rem_cons,
                     rate=rt, sd=dev, cori=correlated_items,
-                    use_dp=use_dp, num_instances=num_instances)
-            print_res(inst)
+                    use_dp=use_dp, num_instances=num_instances,
+                    vectorized=vectorized)
+            print_res(stats)
     close_files()
 
+    if writer is not None:
+        writer.save(results_file)
+        writer = None
 
-def run_pr(instance_type, num_bins,num_resources,min_fill,rem,rate=1.,
-        sd=.1, cori = False, use_dp=False, num_instances=100, seed=0):
-    instances = []
+
+CHUNK = 1000 # number of instances generated at once by the vectorized generators
+
+def instance_stream(instance_type, num_bins, num_resources, min_fill, rem,
+        rate=1., sd=.1, cori=False, num_instances=100, seed=0, vectorized=False):
+    """ Yield the instances of a benchmark, one at a time.
+    If vectorized is True, instances are generated by chunks of CHUNK
+    instances with the vectorized generators (requires numpy). """
+    if vectorized:
+        from . import vgenerator
+        import numpy as np
+        rng = np.random.RandomState(seed)
+        if instance_type == 'unif' or instance_type == 'unif-rare':
+            bin_gen, kwargs = vgenerator.unif_bin, dict(rem_cons=rem, proc_rate=rate)
+        elif instance_type == 'correlated':
+            bin_gen, kwargs = vgenerator.correlated_capacities, dict(rem_cons=rem,
+                    dev=sd, correlated_items=cori)
+        else:
+            bin_gen, kwargs = vgenerator.similar, dict(dev=sd)
+        for k in xrange(0, num_instances, CHUNK):
+            for inst in vgenerator.generator(min(CHUNK, num_instances-k), num_bins,
+                    num_resources, min_fill, bin_gen, rng=rng, **kwargs):
+                yield inst.to_instance()
+        return
 
     for i in xrange(num_instances):
         if instance_type == 'unif' or instance_type == 'unif-rare':
             inst = generator(num_bins, num_resources, min_fill, unif_bin,
                     seed, rem_cons=rem, proc_rate=rate)
-        if instance_type == 'correlated':
+        elif instance_type == 'correlated':
             inst = generator(num_bins, num_resources, min_fill,
                     correlated_capacities, seed, rem_cons=rem, dev=sd,
                     correlated_items = cori)
         else:
             inst = generator(num_bins, num_resources, min_fill,
                    similar, seed, dev=sd)
-        instances.append(inst)
         seed += 1
+        yield inst
+
+def run_pr(instance_type, num_bins,num_resources,min_fill,rem,rate=1.,
+        sd=.1, cori = False, use_dp=False, num_instances=100, seed=0,
+        vectorized=False):
+    """ Run all heuristics on a stream of generated instances.
+    Return the statistics (InstanceStats) of the instances """
+    global num_inst
+    stats = InstanceStats()
+    for inst in instance_stream(instance_type, num_bins, num_resources,
+            min_fill, rem, rate, sd, cori, num_instances, seed, vectorized):
+        stats.add(inst)
         run_tests(inst, use_dp)
+        num_inst += 1
 
-    return instances
+    return stats
 
 def run_similarity_measure(instance):
     instance.empty()
     ret = bfd_item_centric(instance.items[:], instance.bins[:], similarity, do_nothing)
     upd(instance,ret)
 
-def run_tests(instance, use_dp=False):
+def run_tests(instance, use_dp=False, rng=None):
     #run_similarity_measure(instance)
     #return
 
-    # Static bfd ic/bc heuristics
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], do_nothing, do_nothing)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], shuffleItemsOnce,shuffleBinsOnce)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], staticItemsOneOverC,staticBinsOneOverC)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], staticItemsOneOverR,staticBinsOneOverR)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], staticItemsROverC,staticBinsROverC)
-    upd(instance,ret)
-
-
-    # Item centric dynamic heuristics
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], shuffleItems,shuffleBins)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], dynamicItemsOneOverC,dynamicBinsOneOverC)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], dynamicItemsOneOverR,dynamicBinsOneOverR)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], dynamicItemsROverC,dynamicBinsROverC)
-    upd(instance,ret)
-
-    # Bin centric dynamic heuristics
-    instance.empty()
-    ret = bfd_bin_centric(instance.items[:], instance.bins[:], shuffleItems,shuffleBins)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_bin_centric(instance.items[:], instance.bins[:], dynamicItemsOneOverC,dynamicBinsOneOverC)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_bin_centric(instance.items[:], instance.bins[:], dynamicItemsOneOverR,dynamicBinsOneOverR)
-    upd(instance,ret)
-    instance.empty()
-    ret = bfd_bin_centric(instance.items[:], instance.bins[:], dynamicItemsROverC,dynamicBinsROverC)
-    upd(instance,ret)
-
-    # Bin balancing
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], do_nothing, do_nothing)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], shuffleItemsOnce,shuffleBinsOnce)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], shuffleItems,shuffleBins)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], staticItemsOneOverC,staticBinsOneOverC)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], dynamicItemsOneOverC,dynamicBinsOneOverC)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], staticItemsOneOverR,staticBinsOneOverR)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], dynamicItemsOneOverR,dynamicBinsOneOverR)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], staticItemsROverC,staticBinsROverC)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], dynamicItemsROverC,dynamicBinsROverC)
-    upd(instance,ret)
-
-    # Single Bin balancing
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], do_nothing, do_nothing, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], shuffleItemsOnce,shuffleBinsOnce, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], shuffleItems,shuffleBins, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], staticItemsOneOverC,staticBinsOneOverC, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], dynamicItemsOneOverC,dynamicBinsOneOverC, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], staticItemsOneOverR,staticBinsOneOverR, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], dynamicItemsOneOverR,dynamicBinsOneOverR, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], staticItemsROverC,staticBinsROverC, single=True)
-    upd(instance,ret)
-    instance.empty()
-    ret = bin_balancing(instance.items[:], instance.bins[:], dynamicItemsROverC,dynamicBinsROverC, single=True)
-    upd(instance,ret)
-
-    # Dot Product
-    if not use_dp:
-        return
-
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], dp_nonorm, do_nothing)
-    upd(instance,ret)
-
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], dp_normC, do_nothing)
-    upd(instance,ret)
-
-    instance.empty()
-    ret = bfd_item_centric(instance.items[:], instance.bins[:], dp_normR, do_nothing)
-    upd(instance,ret)
+    # Same heuristics, in the same order, as the solver
+    from .solver import portfolio
+    for name, heuristic, m1, m2, kwargs in portfolio(use_dp):
+        instance.empty()
+        t = time.time()
+        ret = heuristic(instance.items[:], instance.bins[:], m1, m2, rng=rng, **kwargs)
+        upd(instance, ret, name, time.time()-t)
 
 
 if __name__ == "__main__":
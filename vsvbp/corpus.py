@@ -0,0 +1,132 @@
+"""
+Binary instances corpus (requires numpy)
+
+A corpus file stores many instances as contiguous int32 arrays:
+    header      magic "VBPC", version (uint32), number of instances (uint64)
+                and offset of the index in bytes (uint64)
+    data        for each instance, its requirements (#items x #resources)
+                followed by its capacities (#bins x #resources), as int32
+    index       for each instance, 5 int64: #items, #bins, #resources and
+                offsets of the requirements and the capacities in the data
+                (counted in int32 values)
+
+Instances read from the arc-flow text format have a single bin:
+the typical bin of the instance.
+
+Corpus memory-maps a file and returns its instances as ArrayInstance
+objects whose arrays are views of the file: nothing is parsed or copied.
+"""
+
+import struct
+import numpy as np
+
+from .container import *
+
+MAGIC = b"VBPC"
+VERSION = 1
+HEADER = "<4sIQQ"
+HEADER_SIZE = struct.calcsize(HEADER)
+
+
+################## Writers ####################
+
+def as_arrays(instance):
+    """ Return the requirements and capacities arrays of an instance,
+    given as an Instance, an ArrayInstance or a tuple (items, tbin) """
+    if isinstance(instance, ArrayInstance):
+        reqs, caps = instance.requirements, instance.capacities
+    elif isinstance(instance, Instance):
+        reqs = [i.requirements for i in instance.items]
+        caps = [b.capacities for b in instance.bins]
+    else:
+        items, tbin = instance
+        reqs = [i.requirements for i in items]
+        caps = [tbin.capacities]
+    caps = np.asarray(caps, dtype=np.int32)
+    reqs = np.asarray(reqs, dtype=np.int32).reshape(-1, caps.shape[1])
+    return reqs, caps
+
+
+def write_corpus(filename, instances):
+    """ Write instances (any iterable, it is consumed only once) into a
+    corpus file. Return the number of written instances """
+    index = []
+    offset = 0
+    with open(filename, 'wb') as f:
+        f.write(struct.pack(HEADER, MAGIC, VERSION, 0, 0))
+        for inst in instances:
+            reqs, caps = as_arrays(inst)
+            index.append((len(reqs), len(caps), caps.shape[1],
+                          offset, offset + reqs.size))
+            reqs.tofile(f)
+            caps.tofile(f)
+            offset += reqs.size + caps.size
+        np.asarray(index, dtype=np.int64).reshape(-1, 5).tofile(f)
+        f.seek(0)
+        f.write(struct.pack(HEADER, MAGIC, VERSION, len(index),
+                            HEADER_SIZE + 4*offset))
+    return len(index)
+
+
+def read_arcflow(filename):
+    """ Read a file in the arc-flow format (see scripts/vbp-optim.py).
+    Return an ArrayInstance with a single bin: the typical bin """
+    with open(filename) as f:
+        dim = int(f.readline())
+        cap = [int(x) for x in f.readline().split()]
+        assert dim == len(cap)
+        nitems = int(f.readline())
+        rows = np.array([[int(x) for x in line.split()] for line in f
+                         if line.strip()], dtype=np.int32).reshape(-1, dim+1)
+    assert len(rows) == nitems
+    reqs = np.repeat(rows[:, :dim], rows[:, dim], axis=0)
+    return ArrayInstance(reqs, np.array([cap], dtype=np.int32))
+
+
+def arcflow_corpus(filename, inputs):
+    """ Write the arc-flow files inputs into a corpus file.
+    Return the number of written instances """
+    return write_corpus(filename, (read_arcflow(f) for f in inputs))
+
+
+################## Reader ####################
+
+class Corpus:
+    """ A memory-mapped corpus file """
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            magic, version, count, index_offset = struct.unpack(
+                HEADER, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(filename + " is not a corpus file")
+        self.filename = filename
+        self.count = count
+        size = (index_offset - HEADER_SIZE) // 4
+        self.data = np.zeros(0, dtype=np.int32)
+        self.index = np.zeros((0, 5), dtype=np.int64)
+        # numpy cannot map empty arrays
+        if size:
+            self.data = np.memmap(filename, dtype=np.int32, mode='r',
+                                  offset=HEADER_SIZE, shape=(size,))
+        if count:
+            self.index = np.memmap(filename, dtype=np.int64, mode='r',
+                                   offset=index_offset, shape=(count, 5))
+
+    def __repr__(self):
+        return "Corpus(" + self.filename + ", " + str(self.count) + " instances)"
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        """ Return instance i as an ArrayInstance of views of the file """
+        if i < 0: i += self.count
+        if not 0 <= i < self.count: raise IndexError(i)
+        ni, nb, nr, ro, co = [int(x) for x in self.index[i]]
+        reqs = self.data[ro:ro + ni*nr].reshape(ni, nr)
+        caps = self.data[co:co + nb*nr].reshape(nb, nr)
+        return ArrayInstance(reqs, caps)
+
+    def __iter__(self):
+        for i in xrange(self.count):
+            yield self[i]
@@ -0,0 +1,91 @@
+"""
+    Exact branch and bound for small vector packing problems
+
+    Decides whether a list of items can be packed into a given number
+    of bins having the same capacities. This is only meant to be used
+    on small instances (up to ~50 items).
+"""
+
+
+from .container import *
+
+MAX_NODES = 200000 # max number of explored nodes
+
+
+def branch_and_bound(items, tbin, nbins, max_nodes=MAX_NODES):
+    """
+    Search for a packing of items into nbins bins with the same capacities
+    as tbin. Items are assigned by decreasing order of their sizes
+    (alpha = beta = 1/C).
+
+    A node is pruned if, in some dimension, the total remaining capacity of
+    the bins is smaller than the total requirement of the unassigned items.
+    Bins with the same remaining capacities are equivalent, so an item is
+    tried only once in each class of equivalent bins (in particular, in
+    only one empty bin). Visited states (next item, remaining capacities)
+    which led to no packing are memorized and never explored again.
+
+    Return a tuple (status, bins):
+        status is True if a packing has been found, bins is that packing;
+        status is False if there is no such packing;
+        status is None if the search was stopped after max_nodes nodes.
+    """
+    if vp_lower_bound(items, tbin) > nbins:
+        return False, None
+    if not items:
+        return True, [Bin(tbin.capacities) for i in xrange(nbins)]
+
+    cap = tbin.capacities
+    it = items[:]
+    for i in it:
+        i.size = sum(float(r)/c if c else 0 for r, c in zip(i.requirements, cap))
+    sortl(it, dec=True)
+    reqs = [tuple(i.requirements) for i in it]
+    dims = range(len(cap))
+
+    # suffix[k] is the total requirement of items k, k+1, ...
+    suffix = [(0,)*len(cap)]
+    for r in reversed(reqs):
+        suffix.append(tuple(a+b for a, b in zip(r, suffix[-1])))
+    suffix.reverse()
+
+    rem = [tuple(cap)]*nbins
+    total = [c*nbins for c in cap]
+    assign = [0]*len(it)
+    visited = set()
+    nodes = [0]
+
+    def search(k):
+        if k == len(it): return True
+        nodes[0] += 1
+        if nodes[0] > max_nodes: return None
+        for d in dims:
+            if total[d] < suffix[k][d]: return False
+        state = (k, tuple(sorted(rem)))
+        if state in visited: return False
+
+        req = reqs[k]
+        tried = set()
+        for j in xrange(nbins):
+            r = rem[j]
+            if r in tried: continue
+            tried.add(r)
+            if any(a > b for a, b in zip(req, r)): continue
+            rem[j] = tuple(b-a for a, b in zip(req, r))
+            for d in dims: total[d] -= req[d]
+            assign[k] = j
+            ret = search(k+1)
+            rem[j] = r
+            for d in dims: total[d] += req[d]
+            if ret is None or ret: return ret
+
+        visited.add(state)
+        return False
+
+    status = search(0)
+    if not status: return status, None
+
+    bins = [Bin(cap) for j in xrange(nbins)]
+    for i, j in zip(it, assign):
+        bins[j].insert(i)
+    return True, bins
@@ -1,5 +1,6 @@
 import random
 import itertools
+import hashlib
 
 from .container import *
 
@@ -7,6 +8,11 @@ from .container import *
 There are several various generators.
 Instances are always feasible and Instance objects
 are returned with such a solution
+
+Random numbers are drawn from the rng argument of the generators, which
+is either the random module or a random.Random object. Instance i of a
+campaign is generated with its own random.Random, seeded from the campaign
+seed and i, so it does not depend on the process which generates it.
 """
 
 ################## Constants ####################
@@ -42,7 +48,8 @@ def update(items, item_req, bin, cur_vol):
 
 ################## Instances generator ####################
 
-def unif_bin(num_resources, min_fill, rem_cons=1.0, proc_rate = 1.0, minr=MIN_RES, maxr=MAX_RES):
+def unif_bin(num_resources, min_fill, rem_cons=1.0, proc_rate = 1.0, minr=MIN_RES, maxr=MAX_RES,
+             rng=random):
     """
     Makes a bin containing non-correlated items and
     Either Volume(items) > min_fill or a 0 weighted item was generated.
@@ -52,14 +59,14 @@ def unif_bin(num_resources, min_fill, rem_cons=1.0, proc_rate = 1.0, minr=MIN_RE
     """
 
     mf = min(min_fill, 1-1e-15) # helps getting rid of numerical instabilities
-    bin_cap = [random.randint(minr,maxr) for x in xrange(num_resources)]
-    if (proc_rate < 1) and (random.random() > proc_rate):
+    bin_cap = [rng.randint(minr,maxr) for x in xrange(num_resources)]
+    if (proc_rate < 1) and (rng.random() > proc_rate):
         bin_cap[-1] = 0
     b = Bin(bin_cap)
     item_vol = 0.0
     items = []
     while item_vol < mf:
-        it_res = [random.randint(0,int(rem_cons*x)) for x in b.remaining]
+        it_res = [rng.randint(0,int(rem_cons*x)) for x in b.remaining]
         item_vol = update(items, it_res, b, item_vol)
         if not item_vol: break
         prev_vol = item_vol
@@ -68,7 +75,8 @@ def unif_bin(num_resources, min_fill, rem_cons=1.0, proc_rate = 1.0, minr=MIN_RE
 
 
 def correlated_capacities(num_resources, min_fill, dev=.05,
-                          rem_cons=1.0, correlated_items = False, minr=MIN_RES, maxr=MAX_RES):
+                          rem_cons=1.0, correlated_items = False, minr=MIN_RES, maxr=MAX_RES,
+                          rng=random):
     """
     Generates a bin. Bin capacities are correlated,
     and if correlated_items is True item requirements are correlated
@@ -77,10 +85,10 @@ def correlated_capacities(num_resources, min_fill, dev=.05,
     Item capacities are generated in [0,rem_cons*b.remaining].
     """
     mf = min(min_fill, 1-1e-15) # helps getting rid of numerical instabilities
-    base = random.randint(minr,maxr)
+    base = rng.randint(minr,maxr)
     mean = base*dev
     lbd = 1.0/mean
-    bin_cap = [max(0,int(round(base+(random.expovariate(lbd)-mean))))
+    bin_cap = [max(0,int(round(base+(rng.expovariate(lbd)-mean))))
                for x in xrange(num_resources)]
     b = Bin(bin_cap)
     item_vol = 0.0
@@ -88,22 +96,23 @@ def correlated_capacities(num_resources, min_fill, dev=.05,
     while item_vol < mf:
         if correlated_items:
             for tr in xrange(MAX_TRY):
-                base = random.randint(1,int(rem_cons*min(bin_cap)))
+                base = rng.randint(1,int(rem_cons*min(bin_cap)))
                 mean = base*dev
                 lbd = 1.0/mean
-                it_res = [max(0,int(round(base+(random.expovariate(lbd)-mean))))
+                it_res = [max(0,int(round(base+(rng.expovariate(lbd)-mean))))
                       for x in xrange(num_resources)]
                 vl = update(items, it_res, b, item_vol)
                 if vl: break
             item_vol = vl
         else:
-            it_res = [random.randint(0,int(rem_cons*x)) for x in b.remaining]
+            it_res = [rng.randint(0,int(rem_cons*x)) for x in b.remaining]
             item_vol = update(items, it_res, b, item_vol)
         if not item_vol: break
 
     return items, b
 
-def similar_items(num_resources, min_fill, base_item, dev=.05, minr=MIN_RES, maxr=MAX_RES):
+def similar_items(num_resources, min_fill, base_item, dev=.05, minr=MIN_RES, maxr=MAX_RES,
+                  rng=random):
     """
     Generates a bin. Bin capacities are not correlated.
     All items are similar to the given base item.
@@ -111,7 +120,7 @@ def similar_items(num_resources, min_fill, base_item, dev=.05, minr=MIN_RES, max
     """
     mf = min(min_fill, 1-1e-15) # helps getting rid of numerical instabilities
 
-    base = random.randint(minr,maxr)
+    base = rng.randint(minr,maxr)
     mean = base*dev
     lbd = 1.0/mean
     bin_cap = base_item.requirements[:]
@@ -119,7 +128,7 @@ def similar_items(num_resources, min_fill, base_item, dev=.05, minr=MIN_RES, max
         base = 5*v
         mean = base*dev
         lbd = 1.0/mean
-        bin_cap[i] = max(0,int(round(base+(random.expovariate(lbd)-mean))))
+        bin_cap[i] = max(0,int(round(base+(rng.expovariate(lbd)-mean))))
 
     b = Bin(bin_cap)
     item_vol = 0.0
@@ -131,7 +140,7 @@ def similar_items(num_resources, min_fill, base_item, dev=.05, minr=MIN_RES, max
             for i,base in enumerate(it_res):
                 mean = base*dev
                 lbd = 1.0/mean
-                it_res[i] = max(0,int(round(base+(random.expovariate(lbd)-mean))))
+                it_res[i] = max(0,int(round(base+(rng.expovariate(lbd)-mean))))
             vl = update(items, it_res, b, item_vol)
             if vl : break
         item_vol = vl
@@ -140,7 +149,7 @@ def similar_items(num_resources, min_fill, base_item, dev=.05, minr=MIN_RES, max
     return items, b
 
 
-def similar(num_resources, min_fill, dev=.05, minr=MIN_RES, maxr=MAX_RES):
+def similar(num_resources, min_fill, dev=.05, minr=MIN_RES, maxr=MAX_RES, rng=random):
     """
     Generates a bin using a uniform distribution. Bin capacities are not correlated.
     This bin contains items with weight ~ cap/5 + exponential perturbation.
@@ -148,7 +157,7 @@ def similar(num_resources, min_fill, dev=.05, minr=MIN_RES, maxr=MAX_RES):
     """
     mf = min(min_fill, 1-1e-15) # helps getting rid of numerical instabilities
     # generates bin
-    bin_cap = [random.randint(minr,maxr) for x in xrange(num_resources)]
+    bin_cap = [rng.randint(minr,maxr) for x in xrange(num_resources)]
     b = Bin(bin_cap)
 
     item_vol = 0.0
@@ -160,7 +169,7 @@ def similar(num_resources, min_fill, dev=.05, minr=MIN_RES, maxr=MAX_RES):
             for i,base in enumerate(it_res):
                 mean = base*dev
                 lbd = 1.0/mean
-                it_res[i] = max(0,int(round(base+(random.expovariate(lbd)-mean))))
+                it_res[i] = max(0,int(round(base+(rng.expovariate(lbd)-mean))))
             vl = update(items, it_res, b, item_vol)
             if vl : break
         item_vol = vl
@@ -169,46 +178,69 @@ def similar(num_resources, min_fill, dev=.05, minr=MIN_RES, maxr=MAX_RES):
     return items, b
 
 
-def generator(num_bins, num_resources, min_fill, bin_generator = unif_bin, seed=-1, **kwargs):
+def generator(num_bins, num_resources, min_fill, bin_generator = unif_bin, seed=-1,
+              rng=None, **kwargs):
     """
     Generates a non-correlated, uniformly distributed instance,
     with num_bins bins and Volume(items) < min_fill * Volume(bin)
     for any set of items in a bin.
     The instance is guaranteed to be feasible.
+    Random numbers are drawn from rng (a random.Random) if it is provided,
+    from the random module, seeded with seed if seed != -1, otherwise.
     """
     assert 0.0 < min_fill <= 1.0
     assert num_resources < MAX_NUM_RES
-    if seed != -1: random.seed(seed)
+    if rng is None:
+        rng = random
+        if seed != -1: random.seed(seed)
     items = []
     bins = []
     for i in xrange(num_bins):
-        it, bi = bin_generator(num_resources, min_fill, **kwargs)
+        it, bi = bin_generator(num_resources, min_fill, rng=rng, **kwargs)
         items.extend(it)
         bins.append(bi)
 
-    random.shuffle(items)
-    random.shuffle(bins)
+    rng.shuffle(items)
+    rng.shuffle(bins)
     return Instance(items, bins)
 
 
-class ItemBinTestCase(unittest.TestCase):
-    def setUp(self):
-        self.i1 = Item([1,2,9]); self.i2 = Item([4,5,3])
-        self.i3 = Item([0,1,0]); self.i4 = Item([9,8,7])
-        self.i1.size = 1; self.i2.size = 2; self.i3.size = 3; self.i4.size = 0;
-        self.items = [self.i4, self.i3, self.i2, self.i1]
-        self.b1=Bin([5,8,4]); self.b2=Bin([100,0,100]); self.b3=Bin([1,2,9]);
-        self.b1.size=1; self.b2.size=2; self.b3.size=3;
-        self.bins = [self.b1,self.b2,self.b3]
-        self.ins = Instance(self.items, self.bins)
+################## Campaigns ####################
+
+def instance_seed(seed, i):
+    """ Return the seed of instance i of a campaign seeded with seed """
+    h = hashlib.sha1(("%d:%d" % (seed, i)).encode('ascii'))
+    return int(h.hexdigest()[:16], 16)
+
+def instance_rng(seed, i):
+    """ Return the random stream of instance i of a campaign seeded with seed """
+    return random.Random(instance_seed(seed, i))
 
-    def testInstance(self):
-        assert str(self.ins)=="Items:\n"+str(self.items)+"\nBins:\n"+str(self.bins)
+def campaign_instance(args):
+    """ Generate one instance of a campaign.
+    args = (i, seed, num_bins, num_resources, min_fill, bin_generator, kwargs) """
+    i, seed, num_bins, num_resources, min_fill, bin_generator, kwargs = args
+    return generator(num_bins, num_resources, min_fill, bin_generator,
+                     rng=instance_rng(seed, i), **kwargs)
 
-    def testGenerator(self):
-        iss=generator(2,2,.5,seed=0)
-        assert iss.items[1].requirements==[356, 197]
-        assert iss.bins[1].capacities == [516,411]
+def campaign(num_instances, num_bins, num_resources, min_fill,
+             bin_generator=unif_bin, seed=0, processes=1, **kwargs):
+    """
+    Generates num_instances instances (see generator) using a pool of
+    processes (processes=None uses all cores). The i-th instance only
+    depends on seed and i: the result does not depend on processes.
+    """
+    args = [(i, seed, num_bins, num_resources, min_fill, bin_generator, kwargs)
+            for i in xrange(num_instances)]
+    if processes == 1:
+        return map(campaign_instance, args)
+    import multiprocessing
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(campaign_instance, args)
+    finally:
+        pool.close()
+        pool.join()
 
 
 def main():
@@ -228,5 +260,6 @@ def main():
     print "Similar Items"
     print generator(3, 3, .75, similar_items, base_item=Item([50,50,50]),dev=.15,seed=0)
 
+
 if __name__ == "__main__":
     main()
@@ -1,63 +1,180 @@
-import unittest
+import bisect
+import heapq
+import itertools
 from collections import deque
 
-from .measures import *
-from .container import *
+from .measures import instantiate, compute_item_req, compute_bin_res
+from .container import maxl, minl, sortl
+from .index import ItemIndex
+from .preprocess import compatibility_masks
 
 ################## Heuristics ####################
 
-def bfd_item_centric(items, bins, item_measure, bin_measure):
+def overloaded(items, bins):
+    """ Return True if the total requirement of items exceeds the total
+    remaining capacity of bins in some dimension: some items cannot be packed """
+    if not items: return False
+    if not bins: return True
+    return any(r > c for r, c in zip(compute_item_req(items), compute_bin_res(bins)))
+
+def bin_classes(bins):
+    """ Return a dict id(bin) -> class of the bins having the same capacities.
+    Empty bins of the same class are interchangeable: if an item does not
+    fit into one of them, it fits into none, and the heuristics skip the
+    others for this item. Each bin is still visited by the scans """
+    classes = {}
+    return dict((id(b), classes.setdefault(tuple(b.capacities), len(classes)))
+                for b in bins)
+
+def bin_groups(bins, masks):
+    """ Return the list of pairs (mask, group): group lists, in the order of
+    bins, the bins whose compatibility bitset is mask (see
+    preprocess.compatibility). None if masks is None """
+    if masks is None: return None
+    groups = {}
+    for b in bins:
+        groups.setdefault(masks[id(b)], []).append(b)
+    return sorted(groups.items())
+
+def decorated(group, g, key):
+    """ Iterate over the bins of group as tuples (key(bin), g, rank, bin) """
+    for k, b in enumerate(group):
+        yield key(b), g, k, b
+
+def merged(groups, key):
+    """ Iterate over the bins of groups (each one sorted by increasing key)
+    by increasing key(bin). Ties are broken by group, then by rank """
+    for entry in heapq.merge(*[decorated(group, g, key)
+                               for g, group in enumerate(groups)]):
+        yield entry[-1]
+
+def give_up(failed, it, rank):
+    """ Add the items left in it to failed, from rank rank. Return failed """
+    failed.extend((rank+r, i) for r, i in enumerate(it))
+    return failed
+
+
+def last(steps):
+    """ Run a steppable heuristic to completion. Return its last step """
+    for failed in steps: pass
+    return failed
+
+
+def bfd_item_centric(items, bins, item_measure, bin_measure, rng=None,
+                     fail_fast=False, presorted=False, compat=None):
     """
     Best fit heuristic - item centric :
         Place successive items in the the first feasible bin.
         Sort bins after each iteration
         (one iteration = one item is placed).
+        Once an item does not fit into an empty bin, other empty bins with
+        the same capacities are skipped for this item without re-checking
+        them (see bin_classes). Bins which cannot provide a resource
+        required by the item are never visited: the bins are sorted by
+        groups of bins with the same compatibility (see
+        preprocess.compatibility) and only the groups compatible with the
+        item are scanned.
+
+    compat is the result of preprocess.compatibility_masks on items and bins,
+    computed here if it is None.
+
+    Randomized measures draw their random numbers from rng (see instantiate).
+    If fail_fast is True, the heuristic stops at the first unpacked item
+    (or before packing anything if the items overload the bins), and all
+    items left are returned as unpacked.
+    If presorted is True, items are already sorted by decreasing sizes of
+    item_measure, a static measure (see measures.STATIC_ITEM_MEASURES):
+    they are taken in this order and item_measure is not run.
 
     Return the list of unpacked items.
     If all items have been packed, this list is empty.
     Otherwise, failed[i] is a tuple (r,i). r is the rank of the item
     (means r items have been tried before) and i is the item
     """
+    return last(bfd_item_centric_steps(items, bins, item_measure, bin_measure,
+                                       rng, fail_fast, presorted, compat))
+
+
+def bfd_item_centric_steps(items, bins, item_measure, bin_measure, rng=None,
+                           fail_fast=False, presorted=False, compat=None):
+    """ Steppable bfd_item_centric: a generator yielding the list of
+    unpacked items after each iteration, and once more at the end """
 
     # create list of items
     it = deque(items)
     failed = [] # set of unpacked items
+    if fail_fast and overloaded(it, bins):
+        yield give_up(failed, it, 0)
+        return
     
     # Initializing measures
-    item_measure(it, bins, init=True)
+    item_measure = instantiate(item_measure, rng)
+    bin_measure = instantiate(bin_measure, rng)
+    if not presorted: item_measure(it, bins, init=True)
     bin_measure(it, bins, init=True)
+    classes = bin_classes(bins)
+    masks, needs = compatibility_masks(it, bins) if compat is None else compat
+    groups = bin_groups(bins, masks)
+    if groups is not None:
+        # Bins of the same size are taken in the order of bins
+        rank = dict((id(b), k) for k, b in enumerate(bins))
+        order = lambda b: (b.size, rank[id(b)])
     
     iter = 0
     while it:
         # Compute sizes
-        item_measure(it, bins)
+        if not presorted: item_measure(it, bins)
         bin_measure(it, bins)
         
         # Get biggest item
-        i = maxl(it)
-        it.remove(i)
+        if presorted:
+            i = it.popleft()
+        else:
+            i = maxl(it)
+            it.remove(i)
         
         # Sort bins by increasing order of their sizes
-        sortl(bins, dec=False)
+        if groups is None:
+            sortl(bins, dec=False)
+            candidates = bins
+        else:
+            need = needs[id(i)]
+            compatible = [group for mask, group in groups if not need & mask]
+            for group in compatible: group.sort(key=order)
+            candidates = merged(compatible, order)
         
         packed = False
-        for b in bins:
+        rejected = set() # classes of the empty bins which cannot host i
+        for b in candidates:
+            if not b.items and classes[id(b)] in rejected: continue
             if b.add(i):
                 packed = True
                 break
+            if not b.items: rejected.add(classes[id(b)])
         if not packed:
             failed.append((iter, i))
+            if fail_fast:
+                yield give_up(failed, it, iter+1)
+                return
         iter += 1
+        yield failed
 
-    return failed
+    yield failed
 
 
-def bfd_bin_centric(items, bins, item_measure, bin_measure):
+def bfd_bin_centric(items, bins, item_measure, bin_measure, rng=None,
+                    fail_fast=False):
     """
     Best fit heuristic - bin centric :
-        Pack items in selected bin.
-        Sort items after each iteration
+        Pack items in selected bin, by decreasing sizes
         (one iteration = one bin is consumed).
+        Only the items which may fit into the selected bin are tried
+        (see index.ItemIndex), and an item which did not fit is not tried
+        again until the next bin is selected.
+
+    Randomized measures draw their random numbers from rng (see instantiate).
+    If fail_fast is True, the heuristic stops as soon as the items left
+    overload the bins left (see overloaded).
 
     Return the list of unpacked items.
     If all items have been packed, this list is empty.
@@ -66,16 +183,31 @@ def bfd_bin_centric(items, bins, item_measure, bin_measure):
     In the bin centric heuristic, failed[0][0] is the number of
     items successfully packed
     """
+    return last(bfd_bin_centric_steps(items, bins, item_measure, bin_measure,
+                                      rng, fail_fast))
+
+
+def bfd_bin_centric_steps(items, bins, item_measure, bin_measure, rng=None,
+                          fail_fast=False):
+    """ Steppable bfd_bin_centric: a generator yielding the list of
+    unpacked items after each packed item, and once more at the end.
+    This list stays empty until the end """
 
     # create lists of bins and items
     bi = deque(bins)
     r = len(items)
+    failed = []
+    if fail_fast and overloaded(items, bi):
+        bi.clear()
     
     # Initializing measures
+    item_measure = instantiate(item_measure, rng)
+    bin_measure = instantiate(bin_measure, rng)
     item_measure(items, bi, init=True)
     bin_measure(items, bi, init=True)
     
     item_measure(items, bi)
+    index = ItemIndex(items)
     while bi:
         # Compute sizes
         bin_measure(items, bi)
@@ -83,6 +215,9 @@ def bfd_bin_centric(items, bins, item_measure, bin_measure):
         # Get smallest bin
         b = minl(bi)
         
+        # The remaining capacities of b only decrease while it is filled:
+        # an item which does not fit into b is never tried again
+        rejected = set()
         keep_going = True
         while keep_going:
             keep_going = False
@@ -91,25 +226,38 @@ def bfd_bin_centric(items, bins, item_measure, bin_measure):
             item_measure(items, bi)
             sortl(items, dec=True)
             
-            # Pack an item
-            for i in items:
+            # Pack an item, among those which may fit: ranks yields the
+            # ranks of the candidates in the sorted items, in order
+            fits = set(itertools.imap(id, index.candidates(b.remaining)))
+            fits.difference_update(rejected)
+            ranks = itertools.compress(itertools.count(), itertools.imap(
+                fits.__contains__, itertools.imap(id, items)))
+            for k in ranks:
+                i = items[k]
                 if b.add(i):
                     keep_going = True
-                    items.remove(i) # VERY UNEFFICIENT !!!
+                    index.remove(i)
+                    del items[k]
                     break
+                rejected.add(id(i))
+                fits.discard(id(i))
+                if not fits: break
+            if keep_going: yield failed
         
         bi.remove(b)
+        if fail_fast and overloaded(items, bi):
+            break
 
-    failed = []
     r -= len(items)   # number of unpacked items
     for i in items:
         failed.append((r, i))
         r += 1
         
-    return failed
+    yield failed
 
 
-def bin_balancing(items, bins, item_measure, bin_measure, single=False):
+def bin_balancing(items, bins, item_measure, bin_measure, single=False, rng=None,
+                  fail_fast=False, presorted=False, compat=None):
     """
     Bin Balancing Heuristic :
         Place an item in a bin, then :
@@ -118,114 +266,112 @@ def bin_balancing(items, bins, item_measure, bin_measure, single=False):
             to the end of the bins list
         (one iteration = one item is placed).
 
+    Randomized measures draw their random numbers from rng (see instantiate).
+    If fail_fast is True, the heuristic stops at the first unpacked item
+    and presorted items are taken in their order. Incompatible bins are
+    never visited (see bfd_item_centric for compat).
+
     Return the list of unpacked items.
     If all items have been packed, this list is empty.
     Otherwise, failed[i] is a tuple (r,i). r is the rank of the item
     (means r items have been tried before) and i is the item
     """
+    return last(bin_balancing_steps(items, bins, item_measure, bin_measure,
+                                    single, rng, fail_fast, presorted, compat))
+
+
+def bin_balancing_steps(items, bins, item_measure, bin_measure, single=False,
+                        rng=None, fail_fast=False, presorted=False, compat=None):
+    """ Steppable bin_balancing: a generator yielding the list of
+    unpacked items after each iteration, and once more at the end """
 
     # create list of items
     it = deque(items)
     failed = [] # set of unpacked items
+    if fail_fast and overloaded(it, bins):
+        yield give_up(failed, it, 0)
+        return
     
     # Initialization
-    item_measure(it, bins, init=True)
+    item_measure = instantiate(item_measure, rng)
+    bin_measure = instantiate(bin_measure, rng)
+    if not presorted: item_measure(it, bins, init=True)
     bin_measure(it, bins, init=True)
     bin_measure(it, bins)
     sortl(bins, dec=False)
+    classes = bin_classes(bins)
+    masks, needs = compatibility_masks(it, bins) if compat is None else compat
+    groups = bin_groups(bins, masks)
     
     mod = len(bins)
     offset = 0    
+    if groups is not None:
+        # Position of each bin in the (rotated) order of the bins
+        keys = dict((id(b), k) for k, b in enumerate(bins))
+        starts = dict((mask, [keys[id(b)] for b in group])
+                      for mask, group in groups)
+        members = dict(groups)
+        count = itertools.count(mod)
+        if single:
+            position = lambda b: keys[id(b)]
+        else:
+            position = lambda b: (keys[id(b)] - offset) % mod
     iter = 0
     while it:
         # Compute sizes
-        item_measure(it, bins)
+        if not presorted: item_measure(it, bins)
         
         # Get biggest item
-        i = maxl(it)
-        it.remove(i)
+        if presorted:
+            i = it.popleft()
+        else:
+            i = maxl(it)
+            it.remove(i)
                 
         packed = False
-        gen = (bins[(i+offset) % mod] for i in xrange(mod))
+        rejected = set() # classes of the empty bins which cannot host i
+        if groups is None:
+            gen = (bins[(i+offset) % mod] for i in xrange(mod))
+        else:
+            need = needs[id(i)]
+            compatible = []
+            for mask, group in groups:
+                if need & mask: continue
+                k = bisect.bisect_left(starts[mask], offset) if offset else 0
+                compatible.append(group[k:] + group[:k])
+            gen = merged(compatible, position)
         for rk, b in enumerate(gen):
+            if not b.items and classes[id(b)] in rejected: continue
             if b.add(i):
                 packed = True
                 if single:
                     bins.remove(b)
                     bins.append(b)
-                else:
+                    if groups is not None:
+                        group = members[masks[id(b)]]
+                        group.remove(b)
+                        group.append(b)
+                        keys[id(b)] = next(count)
+                elif groups is None:
                     offset = (offset+rk+1) % mod
+                else:
+                    offset = (keys[id(b)]+1) % mod
                 break
+            if not b.items: rejected.add(classes[id(b)])
         if not packed:
             failed.append((iter, i))
+            if fail_fast:
+                yield give_up(failed, it, iter+1)
+                return
         iter += 1
+        yield failed
 
-    return failed
-
-################## Unit tests ####################
-
-class HeuristicsTestCase(unittest.TestCase):
-    def setUp(self):
-        self.i1 = Item([1,2,9]); self.i2 = Item([4,5,3])
-        self.i3 = Item([0,1,0]); self.i4 = Item([9,8,7])
-        self.i1.size = 1; self.i2.size = 2; self.i3.size = 3; self.i4.size = 0; 
-        self.items = [self.i4, self.i3, self.i2, self.i1]
-        self.b1=Bin([5,8,4]); self.b2=Bin([100,0,100]); self.b3=Bin([1,2,9]);
-        self.b1.size=1; self.b2.size=2; self.b3.size=3; 
-        self.bins = [self.b1,self.b2,self.b3]
+    yield failed
 
 
-    def testItemCentricSuccess(self):
-        ret = bfd_item_centric(self.items[1:], self.bins, do_nothing, do_nothing)
-        assert ret == []
-        
-    def testItemCentricFailure(self):
-        ret = bfd_item_centric(self.items, self.bins, do_nothing, do_nothing)
-        assert self.b3.items == [self.i1]
-        assert self.b2.items == []
-        assert self.b1.items == [self.i3,self.i2]
-        assert ret == [(3,self.i4)]
-        
-    def testBinCentricSuccess(self):
-        ret = bfd_bin_centric(self.items[1:], self.bins, do_nothing, do_nothing)
-        assert ret == []
-        
-    def testBinCentricFailure(self):
-        ret = bfd_bin_centric(self.items, self.bins, do_nothing, do_nothing)
-        assert self.b3.items == [self.i1]
-        assert self.b2.items == []
-        assert self.b1.items == [self.i3,self.i2]
-        assert ret == [(3,self.i4)]
-        
-    def testFailure(self):
-        self.i4.size = 10; 
-        ret = bfd_item_centric(self.items, self.bins, do_nothing, do_nothing)
-        assert self.b3.items == [self.i1]
-        assert self.b2.items == []
-        assert self.b1.items == [self.i3,self.i2]
-        assert ret == [(0,self.i4)]
-        self.setUp(); self.i4.size = 10; 
-        ret = bfd_bin_centric(self.items, self.bins, do_nothing, do_nothing)
-        assert self.b3.items == [self.i1]
-        assert self.b2.items == []
-        assert self.b1.items == [self.i3,self.i2]
-        assert ret == [(3,self.i4)]
-        
-    def testOriginalBinBalancing(self):
-        self.i2.requirements=[1,1,1]
-        ret = bin_balancing(self.items, self.bins, do_nothing, do_nothing, False)
-        assert self.b1.items == [self.i3]
-        assert self.b2.items == []
-        assert self.b3.items == [self.i2]
-        assert ret == [(2,self.i1),(3,self.i4)]    
-        
-    def testSingleBinBalancing(self):
-        self.i2.requirements=[1,1,1]
-        ret = bin_balancing(self.items, self.bins, do_nothing, do_nothing, True)
-        assert self.b1.items == [self.i3]
-        assert self.b2.items == []
-        assert self.b3.items == [self.i2]
-        assert ret == [(2,self.i1),(3,self.i4)] 
-        
-if __name__ == "__main__":
-    unittest.main()
+# Steppable version of each heuristic
+STEPS = {
+    bfd_item_centric: bfd_item_centric_steps,
+    bfd_bin_centric: bfd_bin_centric_steps,
+    bin_balancing: bin_balancing_steps,
+}
@@ -0,0 +1,139 @@
+"""
+    Indexes over the bins and items of a packing
+
+    ResidualIndex answers "which bins can host this item?" without testing
+    every bin. For each resource, the bins are kept sorted by their
+    remaining capacity. A query finds, with one binary search per resource,
+    the resource for which the fewest bins have enough remaining capacity,
+    and only tests those bins.
+
+    The index is not notified by the bins: update(bin) must be called after
+    items are inserted into (or removed from) an indexed bin.
+
+    ItemIndex is the converse: the items are kept sorted by their
+    requirements, and a query returns the items which may fit into
+    given remaining capacities.
+"""
+
+import bisect
+import itertools
+
+INFINITY = float('inf')
+
+
+class ResidualIndex:
+    """ An index over the remaining capacities of bins """
+    def __init__(self, bins=()):
+        self.keys = []     # keys[r]: sorted list of (remaining[r], number)
+        self.bins = []     # bins[r]: the bins, in the order of keys[r]
+        self.entries = {}  # id(bin) -> (number, remaining when indexed)
+        self.count = itertools.count()
+        for b in bins:
+            self.add(b)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, bin):
+        return id(bin) in self.entries
+
+    def add(self, bin):
+        """ Add bin to the index """
+        if not self.keys:
+            self.keys = [[] for r in bin.remaining]
+            self.bins = [[] for r in bin.remaining]
+        entry = (next(self.count), tuple(bin.remaining))
+        self.entries[id(bin)] = entry
+        for keys, bins, rem in zip(self.keys, self.bins, entry[1]):
+            rk = bisect.bisect_left(keys, (rem, entry[0]))
+            keys.insert(rk, (rem, entry[0]))
+            bins.insert(rk, bin)
+
+    def remove(self, bin):
+        """ Remove bin from the index """
+        number, remaining = self.entries.pop(id(bin))
+        for keys, bins, rem in zip(self.keys, self.bins, remaining):
+            rk = bisect.bisect_left(keys, (rem, number))
+            del keys[rk]
+            del bins[rk]
+
+    def update(self, bin):
+        """ Take into account the new remaining capacities of bin """
+        self.remove(bin)
+        self.add(bin)
+
+    def candidates(self, requirements):
+        """ Return the bins whose remaining capacity is large enough for
+        the most selective resource of requirements. This is a superset
+        of the bins which can host the requirements """
+        if not self.entries: return []
+        best, start = 0, -1
+        for r, (keys, req) in enumerate(zip(self.keys, requirements)):
+            rk = bisect.bisect_left(keys, (req,))
+            if rk > start:
+                best, start = r, rk
+        return self.bins[best][max(start, 0):]
+
+    def feasible(self, item):
+        """ Return the bins which can host item """
+        return [b for b in self.candidates(item.requirements) if b.feasible(item)]
+
+    def best(self, item, key):
+        """ Return the bin which can host item with the smallest key(bin),
+        None if item fits in no bin """
+        bins = self.feasible(item)
+        if not bins: return None
+        return min(bins, key=key)
+
+
+class ItemIndex:
+    """ An index over the requirements of items """
+    def __init__(self, items=()):
+        self.keys = []     # keys[r]: sorted list of (requirements[r], number)
+        self.items = []    # items[r]: the items, in the order of keys[r]
+        self.entries = {}  # id(item) -> number
+        self.count = itertools.count()
+        for i in items:
+            self.add(i)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return id(item) in self.entries
+
+    def add(self, item):
+        """ Add item to the index """
+        if not self.keys:
+            self.keys = [[] for r in item.requirements]
+            self.items = [[] for r in item.requirements]
+        number = next(self.count)
+        self.entries[id(item)] = number
+        for keys, items, req in zip(self.keys, self.items, item.requirements):
+            rk = bisect.bisect_left(keys, (req, number))
+            keys.insert(rk, (req, number))
+            items.insert(rk, item)
+
+    def remove(self, item):
+        """ Remove item from the index """
+        number = self.entries.pop(id(item))
+        for keys, items, req in zip(self.keys, self.items, item.requirements):
+            rk = bisect.bisect_left(keys, (req, number))
+            del keys[rk]
+            del items[rk]
+
+    def candidates(self, remaining):
+        """ Return the items whose requirement fits into remaining for the
+        most selective resource. This is a superset of the items which
+        fit into remaining """
+        if not self.entries: return []
+        best, end = 0, len(self.entries) + 1
+        for r, (keys, rem) in enumerate(zip(self.keys, remaining)):
+            rk = bisect.bisect_right(keys, (rem, INFINITY))
+            if rk < end:
+                best, end = r, rk
+        return self.items[best][:end]
+
+    def feasible(self, bin):
+        """ Return the items which fit into bin """
+        return [i for i in self.candidates(bin.remaining) if bin.feasible(i)]
@@ -0,0 +1,117 @@
+"""
+    Local search improvement of a partial packing
+
+    The constructive heuristics return the list of items they could not pack.
+    local_search tries to insert these items in the partial packing using
+    item moves and swaps between bins.
+
+    Moves and swaps directly update the remaining capacities of the bins
+    (Bin.insert and Bin.remove), so no residual is ever recomputed.
+"""
+
+
+from .container import *
+
+
+################## Utility functions ####################
+
+def fits(item, bin, out=None):
+    """ Return True iff item can be packed in bin
+    once item out has been removed from bin """
+    if out is None:
+        return bin.feasible(item)
+    for req, rem, fr in zip(item.requirements, bin.remaining, out.requirements):
+        if req > rem + fr:
+            return False
+    return True
+
+def first_fit(item, bins, exclude=None):
+    """ Return the first bin (other than exclude) in which item can be packed,
+    None if there is no such bin """
+    for b in bins:
+        if b is not exclude and b.feasible(item):
+            return b
+    return None
+
+
+################## Local search ####################
+
+def insert_by_move(item, bins):
+    """ Try to pack item in a bin b after moving an item j from b to
+    another bin. Return True iff item has been packed """
+    for b in bins:
+        for j in b.items:
+            if not fits(item, b, j): continue
+            c = first_fit(j, bins, exclude=b)
+            if c is None: continue
+            b.remove(j)
+            c.insert(j)
+            b.insert(item)
+            return True
+    return False
+
+def insert_by_swap(item, bins, tabu):
+    """ Try to pack item in a bin b in place of a smaller item j which
+    is not tabu. Return j if item has been packed, None otherwise """
+    for b in bins:
+        for j in b.items:
+            if j.size >= item.size or j in tabu: continue
+            if not fits(item, b, j): continue
+            b.remove(j)
+            b.insert(item)
+            return j
+    return None
+
+def local_search(bins, failed, max_iter=1000):
+    """
+    Try to pack the items which could not be packed by a heuristic.
+        failed -- the list returned by the heuristic, failed[i] is
+            a tuple (r,i), where i is an unpacked item
+        bins -- the partial packing built by the heuristic
+
+    Unpacked items are considered by decreasing order of their sizes
+    (alpha = beta = 1/C). An item is packed in the first feasible bin,
+    otherwise by moving an item of a bin into another bin, otherwise
+    by swapping it with a smaller item, which becomes unpacked.
+    Swapped in items are tabu: they cannot be swapped out.
+
+    Item sizes are altered.
+    Return the list of unpacked items, with the same format as the heuristics
+    """
+    left = [i for r, i in failed]
+    if not left or not bins: return failed
+
+    # Sizes are normalized by the total bin capacities
+    cap = [0]*len(bins[0].capacities)
+    for b in bins:
+        cap = [c+v for c, v in zip(cap, b.capacities)]
+    res = [1/float(c) if c else 0 for c in cap]
+    for b in bins:
+        for i in b.items:
+            i.size = sum(w*r for w, r in zip(res, i.requirements))
+    for i in left:
+        i.size = sum(w*r for w, r in zip(res, i.requirements))
+
+    tabu = set()
+    stuck = []
+    iter = 0
+    while left and iter < max_iter:
+        iter += 1
+        sortl(left, dec=False)
+        i = left.pop()
+
+        b = first_fit(i, bins)
+        if b is not None:
+            b.insert(i)
+        elif insert_by_move(i, bins):
+            pass
+        else:
+            j = insert_by_swap(i, bins, tabu)
+            if j is None:
+                stuck.append(i)
+            else:
+                tabu.add(i)
+                left.append(j)
+
+    stuck.extend(left)
+    return [(r, i) for r, i in enumerate(stuck)]
@@ -8,11 +8,16 @@ In the following runs, sizes are updated.
 
 These mesures alter attributes sizes from bins and items
 
+Randomized measures are classes: their instances carry their own state
+and random stream. Heuristics create a new measure for each run
+(see instantiate), so several heuristics can run concurrently.
+
 Note that most measures perform some unnecessary redundant computations
 """
 
 import random
 import itertools
+import types
 import math
 
 from .container import *
@@ -27,37 +32,75 @@ def do_nothing(items, bins, init = False):
     return
 
 
-def shuffleBins(items, bins, init = False):
+# Old and new style classes
+CLASS_TYPES = (type, getattr(types, 'ClassType', type))
+
+def instantiate(measure, rng=None):
+    """ Return a new measure if measure is a class (randomized measures),
+    created with the random stream rng. Return measure otherwise """
+    if isinstance(measure, CLASS_TYPES):
+        return measure(rng)
+    return measure
+
+
+class RandomMeasure:
+    """ Abstract base class of the randomized measures: subclasses are
+    measures, they define __call__(items, bins, init=False).
+    Random numbers are drawn from rng (a random.Random),
+    or from the random module if rng is None """
+    def __init__(self, rng=None):
+        self.rng = random if rng is None else rng
+
+
+class ShuffleBins(RandomMeasure):
     """ Assign random sizes to the bins if init is set to False """
-    if init: return
-    for b in bins:
-        b.size = random.random()
+    def __call__(self, items, bins, init = False):
+        if init: return
+        for b in bins:
+            b.size = self.rng.random()
 
-def shuffleBinsOnce(items, bins, init = False):
-    """ Assign random sizes to the bins on the first invocation
+class ShuffleBinsOnce(RandomMeasure):
+    """ Shuffle the bins on the first invocation
     after a call with init = True """
-    if init:
-        shuffleBins.go = True
-    elif shuffleBins.go:
-        random.shuffle(bins)
-        shuffleBins.go = False
-
-def shuffleItems(items, bins, init = False):
+    def __init__(self, rng=None):
+        RandomMeasure.__init__(self, rng)
+        self.go = False
+
+    def __call__(self, items, bins, init = False):
+        if init:
+            self.go = True
+        elif self.go:
+            self.rng.shuffle(bins)
+            self.go = False
+
+class ShuffleItems(RandomMeasure):
     """ Assign random sizes to the items if init is set to False """
-    if init: return
-    for i in items:
-        i.size = random.random()
+    def __call__(self, items, bins, init = False):
+        if init: return
+        for i in items:
+            i.size = self.rng.random()
 
-def shuffleItemsOnce(items, bins, init = False):
-    """ Assign random sizes to the items on the first invocation
+class ShuffleItemsOnce(RandomMeasure):
+    """ Shuffle the items on the first invocation
     after a call with init = True """
-    if init:
-        shuffleItems.go = True
-    elif shuffleItems.go:
-        random.shuffle(items)
-        shuffleItems.go = False
-        
- 
+    def __init__(self, rng=None):
+        RandomMeasure.__init__(self, rng)
+        self.go = False
+
+    def __call__(self, items, bins, init = False):
+        if init:
+            self.go = True
+        elif self.go:
+            self.rng.shuffle(items)
+            self.go = False
+
+# Names used by the heuristic lists
+shuffleBins = ShuffleBins
+shuffleBinsOnce = ShuffleBinsOnce
+shuffleItems = ShuffleItems
+shuffleItemsOnce = ShuffleItemsOnce
+
+
 ########## Some useful functions ##########     
 
 def compute_item_req(items):
@@ -208,6 +251,16 @@ def dynamicItemsROverC(items, bins, init = False):
         for j, r in enumerate(i.requirements):
             i.size += req[j]*r            
             
+# Item measures computing the sizes once, during initialization:
+# heuristics may sort the items once (see presorted in heuristics.py)
+STATIC_ITEM_MEASURES = (staticItemsOneOverC, staticItemsOneOverR, staticItemsROverC)
+
+def static_order(items, bins, item_measure):
+    """ Return the items sorted by decreasing sizes of a static item measure.
+    Items of the same size keep their order """
+    item_measure(items, bins, init=True)
+    return sorted(items, key=lambda i: i.size, reverse=True)
+
 ########## Norm based ##########
 def norm(item, bin):
     # x is the coefficient minimizing sum_{p,m}((x*R(p,r)-C(m,r))^2)
@@ -297,141 +350,3 @@ def dp_normC(items,bins,init=False):
     
 def dp_normR(items,bins,init=False):
     dot_product(items,bins,init=False, normR=True)
-        
-################## Unit tests ####################
-class HeuristicsTestCase(unittest.TestCase):
-    def setUp(self):
-        self.i1 = Item([1,2,9]); self.i2 = Item([4,5,3])
-        self.i3 = Item([0,1,0]); self.i4 = Item([9,8,7])
-        self.i1.size = 1; self.i2.size = 2; self.i3.size = 3; self.i4.size = 0; 
-        self.items = [self.i4, self.i3, self.i2, self.i1]
-        self.b1=Bin([5,8,4]); self.b2=Bin([100,0,100]); self.b3=Bin([1,2,9]);
-        self.b1.size=1; self.b2.size=2; self.b3.size=3; 
-        self.bins = [self.b1,self.b2,self.b3]
-
-    def testComputeRem(self):
-        assert compute_item_req(self.items) == [14, 16, 19]
-        assert compute_bin_res(self.bins) == [106, 10, 113]
-        self.b1.add(self.i4)
-        assert compute_bin_res(self.bins) == [106, 10, 113]
-        self.b3.add(self.i3)
-        assert compute_bin_res(self.bins) == [106, 9, 113]
-        
-    def testCMes(self):
-        staticBinsOneOverC(self.items, self.bins, False)
-        staticItemsOneOverC(self.items, self.bins, False)
-        assert self.i1.size == 1; assert self.i2.size == 2;
-        assert self.i3.size == 3; assert self.i4.size == 0;
-        assert self.b1.size==1; assert self.b2.size==2; assert self.b3.size==3; 
-        
-        staticBinsOneOverC(self.items, self.bins, True)
-        staticItemsOneOverC(self.items, self.bins, True)
-        assert abs(self.i1.size - ( 1./106+2./10+9./113 )) < 10**-14
-        assert abs(self.i2.size - ( 4./106+5./10+3./113 )) < 10**-14
-        assert abs(self.i3.size - ( 1./10 )) < 10**-14
-        assert abs(self.i4.size - ( 9./106+8./10+7./113 )) < 10**-14
-        assert abs(self.b1.size - ( 5./106+8./10+4./113 )) < 10**-14
-        assert abs(self.b2.size - ( 100./106+100./113 )) < 10**-14
-        assert abs(self.b3.size - ( 1./106+2./10+9./113 )) < 10**-14
-        
-        self.bins.pop()
-        dynamicBinsOneOverC(self.items, self.bins, True)
-        dynamicItemsOneOverC(self.items, self.bins, True)
-        assert abs(self.i1.size - ( 1./106+2./10+9./113 )) < 10**-14
-        assert abs(self.i2.size - ( 4./106+5./10+3./113 )) < 10**-14
-        assert abs(self.i3.size - ( 1./10 )) < 10**-14
-        assert abs(self.i4.size - ( 9./106+8./10+7./113 )) < 10**-14
-        assert abs(self.b1.size - ( 5./106+8./10+4./113 )) < 10**-14
-        assert abs(self.b2.size - ( 100./106+100./113 )) < 10**-14
-        assert abs(self.b3.size - ( 1./106+2./10+9./113 )) < 10**-14
-        
-        dynamicBinsOneOverC(self.items, self.bins)
-        dynamicItemsOneOverC(self.items, self.bins)
-        assert abs(self.i1.size - ( 1./105+2./8+9./104 )) < 10**-14
-        assert abs(self.i2.size - ( 4./105+5./8+3./104 )) < 10**-14
-        assert abs(self.i3.size - ( 1./8 )) < 10**-14
-        assert abs(self.i4.size - ( 9./105+8./8+7./104 )) < 10**-14
-        assert abs(self.b1.size - ( 5./105+8./8+4./104 )) < 10**-14
-        assert abs(self.b2.size - (100./105+100./104)) < 10**-14
-        assert abs(self.b3.size - ( 1./106+2./10+9./113 )) < 10**-14
-        
-    def testRMes(self):
-        staticBinsOneOverR(self.items, self.bins, False)
-        staticItemsOneOverR(self.items, self.bins, False)
-        assert self.i1.size == 1; assert self.i2.size == 2;
-        assert self.i3.size == 3; assert self.i4.size == 0;
-        assert self.b1.size==1; assert self.b2.size==2; assert self.b3.size==3; 
-        
-        staticBinsOneOverR(self.items, self.bins, True)
-        staticItemsOneOverR(self.items, self.bins, True)
-        assert abs(self.i1.size - ( 1./14+2./16+9./19 )) < 10**-14
-        assert abs(self.i2.size - ( 4./14+5./16+3./19 )) < 10**-14
-        assert abs(self.i3.size - ( 1./16 )) < 10**-14
-        assert abs(self.i4.size - ( 9./14+8./16+7./19 )) < 10**-14
-        assert abs(self.b1.size - ( 5./14+8./16+4./19 )) < 10**-14
-        assert abs(self.b2.size - ( 100./14+100./19 )) < 10**-14
-        assert abs(self.b3.size - ( 1./14+2./16+9./19 )) < 10**-14
-        
-        self.items.pop(0)
-        dynamicBinsOneOverR(self.items, self.bins, True)
-        dynamicItemsOneOverR(self.items, self.bins, True)
-        assert abs(self.i1.size - ( 1./14+2./16+9./19 )) < 10**-14
-        assert abs(self.i2.size - ( 4./14+5./16+3./19 )) < 10**-14
-        assert abs(self.i3.size - ( 1./16 )) < 10**-14
-        assert abs(self.i4.size - ( 9./14+8./16+7./19 )) < 10**-14
-        assert abs(self.b1.size - ( 5./14+8./16+4./19 )) < 10**-14
-        assert abs(self.b2.size - ( 100./14+100./19 )) < 10**-14
-        assert abs(self.b3.size - ( 1./14+2./16+9./19 )) < 10**-14
-        
-        dynamicBinsOneOverR(self.items, self.bins)
-        dynamicItemsOneOverR(self.items, self.bins)
-        assert abs(self.i1.size - ( 1./5+2./8+9./12 )) < 10**-14
-        assert abs(self.i2.size - ( 4./5+5./8+3./12 )) < 10**-14
-        assert abs(self.i3.size - ( 1./8 )) < 10**-14
-        assert abs(self.i4.size - ( 9./14+8./16+7./19 )) < 10**-14
-        assert abs(self.b1.size - ( 5./5+8./8+4./12 )) < 10**-14
-        assert abs(self.b2.size - (100./5+100./12)) < 10**-14
-        assert abs(self.b3.size - ( 1./5+2./8+9./12 )) < 10**-14
-        
-    def testRCMes(self):
-        staticBinsROverC(self.items, self.bins, False)
-        staticItemsROverC(self.items, self.bins, False)
-        assert self.i1.size == 1; assert self.i2.size == 2;
-        assert self.i3.size == 3; assert self.i4.size == 0;
-        assert self.b1.size==1; assert self.b2.size==2; assert self.b3.size==3; 
-        
-        staticBinsROverC(self.items, self.bins, True)
-        staticItemsROverC(self.items, self.bins, True)
-        assert abs(self.i1.size - ( 14./106.+2.*16./10.+9.*19./113. )) < 10**-14
-        assert abs(self.i2.size - ( 4.*14./106.+5.*16./10.+3.*19./113. )) < 10**-14
-        assert abs(self.i3.size - ( 16./10. )) < 10**-14
-        assert abs(self.i4.size - ( 9.*14./106.+8.*16./10.+7.*19./113. )) < 10**-14
-        assert abs(self.b1.size - ( 5.*14./106.+8.*16./10.+4.*19./113. )) < 10**-14
-        assert abs(self.b2.size - ( 100.*14./106.+100.*19./113. )) < 10**-14
-        assert abs(self.b3.size - ( 14./106.+2.*16./10.+9.*19./113. )) < 10**-14
-        
-        i=self.items.pop(2)
-        assert self.b1.add(i)
-        dynamicBinsROverC(self.items, self.bins, True)
-        dynamicItemsROverC(self.items, self.bins, True)
-        assert abs(self.i1.size - ( 14./106.+2.*16./10.+9.*19./113. )) < 10**-14
-        assert abs(self.i2.size - ( 4.*14./106.+5.*16./10.+3.*19./113. )) < 10**-14
-        assert abs(self.i3.size - ( 16./10. )) < 10**-14
-        assert abs(self.i4.size - ( 9.*14./106.+8.*16./10.+7.*19./113. )) < 10**-14
-        assert abs(self.b1.size - ( 5.*14./106.+8.*16./10.+4.*19./113. )) < 10**-14
-        assert abs(self.b2.size - ( 100.*14./106.+100.*19./113. )) < 10**-14
-        assert abs(self.b3.size - ( 14./106.+2.*16./10.+9.*19./113. )) < 10**-14
-        
-        dynamicBinsROverC(self.items, self.bins)
-        dynamicItemsROverC(self.items, self.bins)
-        assert abs(self.i1.size - ( 10./102.+2.*11./5.+9.*16./110. )) < 10**-14
-        assert abs(self.i2.size - ( 4.*14./106.+5.*16./10.+3.*19./113. )) < 10**-14
-        assert abs(self.i3.size - ( 11./5. )) < 10**-14
-        assert abs(self.i4.size - ( 9.*10./102.+8.*11./5.+7.*16./110. )) < 10**-14
-        assert abs(self.b1.size - ( 10./102.+3.*11./5.+16./110. )) < 10**-14
-        assert abs(self.b2.size - ( 100.*10./102.+100.*16./110. )) < 10**-14
-        assert abs(self.b3.size - ( 10./102.+2.*11./5.+9.*16./110. )) < 10**-14
-        
-        
-if __name__ == "__main__":
-    unittest.main()
@@ -0,0 +1,283 @@
+"""
+    Online placement of items into an existing packing
+
+    Items are placed one at a time (or one batch at a time) into bins that
+    may already contain items, without re-running a whole heuristic.
+    Bins are kept sorted by their size in an index which is updated
+    incrementally after each insertion.
+
+    Sizes are computed as in the static measures: the weights (1/C, 1/R
+    or R/C) are computed when the index is refreshed and kept until the next
+    refresh. place_batch refreshes the index before placing a batch.
+
+    With indexed=True, the bins are also kept in a ResidualIndex (see
+    index.py): when few bins have enough remaining capacity for the most
+    selective resource of an item, only these bins are tested.
+
+    Items can also leave the packing. After a batch of departures,
+    consolidate tries to empty the lightly loaded bins which were affected
+    by the departures, moving their items into the other bins.
+"""
+
+import bisect
+import itertools
+
+from .container import *
+from .index import ResidualIndex
+from .measures import compute_item_req, compute_bin_res, dp
+
+MEASURES = ["1/C", "1/R", "R/C", "dp", "dp_normC", "dp_normR"]
+# With a ResidualIndex, the candidate bins of an item are only used if at
+# most 1/SELECTIVITY of the bins are candidates. Otherwise the bins are
+# scanned by increasing sizes, which stops at the first feasible bin
+SELECTIVITY = 4
+
+
+################## Weights ####################
+
+def inverse(v):
+    """ Return [1/v[0], 1/v[1], ...] (0 is used instead of 1/0) """
+    return [1/float(x) if x != 0 else 0 for x in v]
+
+def measure_weights(measure, items, bins):
+    """ Return the weights alpha = beta used by measure
+    to compute the sizes of the items and bins (no weights without bins) """
+    if not bins: return []
+    s = len(bins[0].capacities)
+    if measure == "1/C" or measure == "R/C":
+        res = compute_bin_res(bins)
+        if measure == "1/C": return inverse(res)
+        req = compute_item_req(items) if items else [0]*s
+        return [r*w for r, w in zip(req, inverse(res))]
+    if measure == "1/R":
+        req = compute_item_req(items) if items else [0]*s
+        return inverse(req)
+    # dot products do not use weights
+    return [1.0]*s
+
+def load(bin):
+    """ Return a float in [0 ; 1] corresponding to the average
+    percentage of capacity used in the bin """
+    ll = 0
+    sm = 0.0
+    for c, r in zip(bin.capacities, bin.remaining):
+        if c:
+            sm += float(c-r)/c
+            ll += 1
+    if not ll: return 0.0
+    return sm/ll
+
+def weighted_size(weights, vector):
+    """ Return the weighted sum of vector """
+    s = 0
+    for w, v in zip(weights, vector):
+        s += w*v
+    return s
+
+
+################## Online packer ####################
+
+class OnlinePacker:
+    """ Place arriving items into a list of (partially filled) bins.
+
+    Keyword arguments:
+        bins -- the bins, they may already contain items
+        measure -- one of MEASURES. With "1/C", "1/R" and "R/C", an item
+            is placed in the feasible bin of smallest size (best fit).
+            With dot products, an item is placed in the feasible bin
+            maximizing the dot product.
+        indexed -- if True, the bins tested for an item are restricted
+            with a ResidualIndex. The selected bins are the same
+    """
+    def __init__(self, bins, measure="1/C", indexed=False):
+        assert measure in MEASURES
+        self.measure = measure
+        self.residuals = ResidualIndex() if indexed else None
+        self.bins = bins[:]
+        self.location = {}  # item -> bin containing the item
+        for b in self.bins:
+            for i in b.items:
+                self.location[i] = b
+        self.refresh()
+
+    def __repr__(self):
+        return "OnlinePacker(" + self.measure + "):\n" + str(self._bins)
+
+    def refresh(self, items=None):
+        """ Recompute the weights and rebuild the index.
+        items is the list of items about to be placed. If it is not
+        provided, the items already packed are used to estimate
+        the requirements (1/R and R/C measures) """
+        if items is None:
+            items = [i for b in self.bins for i in b.items]
+        self.weights = measure_weights(self.measure, items, self.bins)
+        for b in self.bins:
+            b.size = weighted_size(self.weights, b.remaining)
+        self._bins = sortl(self.bins[:], dec=False)
+        self._sizes = [b.size for b in self._bins]
+        # id(bin) -> size of the bin when it was indexed
+        self._keys = dict((id(b), b.size) for b in self._bins)
+        # Ties between bins of equal sizes are broken by their ranks
+        self._count = itertools.count()
+        self._ranks = dict((id(b), next(self._count)) for b in self._bins)
+        if self.residuals is not None:
+            self.residuals = ResidualIndex(self._bins)
+
+    def add_bin(self, bin):
+        """ Add a new bin to the packing, using the current weights.
+        The weights are computed when the first bin is added """
+        self.bins.append(bin)
+        for i in bin.items:
+            self.location[i] = bin
+        if not self.weights:
+            self.refresh()
+        else:
+            self._index(bin)
+
+    def _index(self, bin):
+        bin.size = weighted_size(self.weights, bin.remaining)
+        rk = bisect.bisect_right(self._sizes, bin.size)
+        self._sizes.insert(rk, bin.size)
+        self._bins.insert(rk, bin)
+        self._keys[id(bin)] = bin.size
+        self._ranks[id(bin)] = next(self._count)
+        if self.residuals is not None:
+            self.residuals.add(bin)
+
+    def _unindex(self, bin):
+        rk = bisect.bisect_left(self._sizes, self._keys.pop(id(bin)))
+        while self._bins[rk] is not bin:
+            rk += 1
+        del self._sizes[rk]
+        del self._bins[rk]
+        if self.residuals is not None:
+            self.residuals.remove(bin)
+
+    def select(self, item):
+        """ Return the bin selected for item, None if item fits in no bin """
+        bins = self._bins
+        if self.residuals is not None:
+            candidates = self.residuals.candidates(item.requirements)
+            if len(candidates) * SELECTIVITY <= len(bins):
+                bins = sorted(candidates,
+                              key=lambda b: (b.size, self._ranks[id(b)]))
+        if self.measure.startswith("dp"):
+            normC = self.measure == "dp_normC"
+            # normalizing an all-zero item would divide by 0: all its
+            # dot products are 0
+            normR = self.measure == "dp_normR" and any(item.requirements)
+            best = -1
+            best_bin = None
+            for b in bins:
+                n = dp(item, b, normC, normR)
+                if n > best:
+                    best = n
+                    best_bin = b
+            return best_bin
+
+        for b in bins:
+            if b.feasible(item):
+                return b
+        return None
+
+    def place(self, item):
+        """ Place item in the packing.
+        Return the bin containing item, None if it could not be packed """
+        b = self.select(item)
+        if b is None: return None
+        self._unindex(b)
+        b.insert(item)
+        self._index(b)
+        self.location[item] = b
+        return b
+
+    def remove(self, item):
+        """ Remove item from the packing. Return the bin which contained it """
+        b = self.location.pop(item)
+        self._unindex(b)
+        b.remove(item)
+        self._index(b)
+        return b
+
+    def depart(self, items):
+        """ Remove a list of items from the packing.
+        Return the list of affected bins """
+        affected = []
+        for i in items:
+            b = self.remove(i)
+            if b not in affected:
+                affected.append(b)
+        return affected
+
+    def consolidate(self, bins=None, threshold=.5):
+        """ Try to empty the given bins (all bins if bins is None) whose
+        load is smaller than threshold, by moving all their items to other
+        non-empty bins. Bins are processed by increasing order of their loads.
+        A bin is either emptied or left unchanged.
+
+        Return the list of emptied bins """
+        if bins is None: bins = self.bins
+        sources = [b for b in bins if b.items and load(b) < threshold]
+        sources.sort(key=load)
+
+        # Empty bins cannot be used as targets
+        closed = [b for b in self._bins if not b.items]
+        for b in closed:
+            self._unindex(b)
+
+        emptied = []
+        for s in sources:
+            if not s.items: continue
+            self._unindex(s)
+            it = s.items[:]
+            for i in it:
+                i.size = weighted_size(self.weights, i.requirements)
+            sortl(it, dec=True)
+
+            moved = []
+            for i in it:
+                b = self.select(i)
+                if b is None: break
+                s.remove(i)
+                self._unindex(b)
+                b.insert(i)
+                self._index(b)
+                moved.append((i, b))
+
+            if len(moved) < len(it):
+                # Failure: restore the bin
+                for i, b in moved:
+                    self._unindex(b)
+                    b.remove(i)
+                    self._index(b)
+                    s.insert(i)
+                self._index(s)
+            else:
+                for i, b in moved:
+                    self.location[i] = b
+                emptied.append(s)
+                closed.append(s)
+
+        for b in closed:
+            self._index(b)
+        return emptied
+
+    def place_batch(self, items):
+        """ Place a list of items in the packing. Items are placed by
+        decreasing order of their sizes.
+
+        Return the list of unpacked items, using the same format
+        as the heuristics: failed[i] is a tuple (r,i) where r is the rank
+        of the item and i is the item """
+        if not items: return []
+        self.refresh(items)
+        it = items[:]
+        for i in it:
+            i.size = weighted_size(self.weights, i.requirements)
+        sortl(it, dec=True)
+
+        failed = []
+        for rk, i in enumerate(it):
+            if self.place(i) is None:
+                failed.append((rk, i))
+        return failed
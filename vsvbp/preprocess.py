@@ -0,0 +1,201 @@
+"""
+    Preprocessing of instances before the heuristics run
+
+    Compatibility: a bin whose capacity on a resource is smaller than every
+    positive requirement on this resource (typically a capacity of 0 on a
+    rare resource) cannot host any item requiring it. Such resources are
+    stored as a bitset per bin, and the resources required by an item as a
+    bitset per item: the item and the bin are compatible iff the two
+    bitsets do not intersect. This is tested once per pair with an AND,
+    instead of Bin.feasible.
+
+    Reduction: before optimize searches the number of bins, the instance
+    can be reduced (see Reduction). Resources which never bind are dropped,
+    items without requirements on the other resources are put aside, items
+    which cannot share a bin with any other item get their own bins, as do
+    items which can only share a bin with one other item (with it), and
+    items which fit no bin make the instance infeasible.
+"""
+
+from .container import Item, Bin, Instance
+
+
+################## Compatibility ####################
+
+def resource_mask(vector):
+    """ Return the bitset of the resources r such that vector[r] > 0 """
+    mask = 0
+    for r, v in enumerate(vector):
+        if v > 0: mask |= 1 << r
+    return mask
+
+def compatibility(items, bins):
+    """ Return a dict id(bin) -> bitset of the resources the bin cannot
+    provide to any item (its capacity is smaller than every positive
+    requirement), None if every bin can provide every resource """
+    smallest = None # smallest positive requirement of each resource
+    for i in items:
+        if smallest is None: smallest = [None] * len(i.requirements)
+        for r, v in enumerate(i.requirements):
+            if v > 0 and (smallest[r] is None or v < smallest[r]):
+                smallest[r] = v
+    if smallest is None: return None
+
+    masks = {}
+    found = False
+    for b in bins:
+        mask = 0
+        for r, (c, s) in enumerate(zip(b.capacities, smallest)):
+            if s is not None and c < s: mask |= 1 << r
+        masks[id(b)] = mask
+        found = found or mask
+    return masks if found else None
+
+def item_masks(items, masks):
+    """ Return a dict id(item) -> bitset of the resources required by item,
+    None if masks (see compatibility) is None """
+    if masks is None: return None
+    return dict((id(i), resource_mask(i.requirements)) for i in items)
+
+def compatibility_masks(items, bins):
+    """ Return the pair (masks, needs) of the bins and items, see
+    compatibility and item_masks. It is computed once per instance and
+    given to the heuristics (compat argument) """
+    masks = compatibility(items, bins)
+    return masks, item_masks(items, masks)
+
+
+################## Reduction ####################
+
+def binding_resources(items, capacities, resources):
+    """ Return the resources (among resources) on which the total
+    requirement of items exceeds the capacity """
+    return [r for r in resources
+            if sum(i.requirements[r] for i in items) > capacities[r]]
+
+def alone(items, capacities, resources):
+    """ Return the items which cannot share a bin with any other item:
+    on some resource, their requirement plus the smallest requirement of
+    the other items exceeds the capacity """
+    if len(items) < 2: return []
+    single = set()
+    for r in resources:
+        # the two smallest requirements on r
+        first = min(items, key=lambda i: i.requirements[r])
+        second = min(i.requirements[r] for i in items if i is not first)
+        for i in items:
+            other = second if i is first else first.requirements[r]
+            if i.requirements[r] + other > capacities[r]:
+                single.add(id(i))
+    return [i for i in items if id(i) in single]
+
+def fit_together(i, j, capacities, resources):
+    """ Return True iff items i and j fit into a bin together """
+    for r in resources:
+        if i.requirements[r] + j.requirements[r] > capacities[r]:
+            return False
+    return True
+
+def pairs(items, capacities, resources):
+    """ Return pairs (i, j) of items such that j is the only other item
+    which fits into a bin with i: some optimal solution has a bin holding
+    exactly i and j. Each item is in one pair at most """
+    ret = []
+    paired = set()
+    for i in items:
+        if id(i) in paired: continue
+        partners = []
+        for j in items:
+            if j is not i and fit_together(i, j, capacities, resources):
+                partners.append(j)
+                if len(partners) > 1: break
+        if len(partners) == 1 and id(partners[0]) not in paired:
+            ret.append((i, partners[0]))
+            paired.update((id(i), id(partners[0])))
+    return ret
+
+def without(items, removed):
+    """ Return the items which are not in removed """
+    if not removed: return items
+    removed = set(id(i) for i in removed)
+    return [i for i in items if id(i) not in removed]
+
+
+class Reduction:
+    """ The reduction of an instance of optimize (items packed into copies
+    of tbin), and the mapping back to the original instance.
+
+    The reduced instance is (items, tbin). It only keeps the resources
+    in resources, and its items are copies of the original ones.
+    Original items are either:
+        unpackable -- they fit into no bin: the instance is infeasible
+        fixed -- they cannot share a bin with any other item
+        pairs -- pairs (i, j) where j is the only item which can share a
+            bin with i: they get a bin of their own
+        free -- they require nothing on the kept resources. They fit
+            into any bin of a solution, see restore
+        or mapped to an item of the reduced instance
+    """
+    def __init__(self, items, tbin):
+        self.original = items[:]
+        self.capacities = tbin.capacities[:]
+        self.unpackable = [i for i in items if not tbin.feasible(i)]
+        self.fixed = []
+        self.pairs = []
+        self.free = []
+        self.resources = range(len(self.capacities))
+
+        left = [i for i in items if tbin.feasible(i)]
+        while not self.unpackable:
+            self.resources = binding_resources(left, self.capacities,
+                                               self.resources)
+            free = [i for i in left
+                    if not any(i.requirements[r] for r in self.resources)]
+            self.free.extend(free)
+            left = without(left, free)
+            fixed = alone(left, self.capacities, self.resources)
+            self.fixed.extend(fixed)
+            left = without(left, fixed)
+            paired = pairs(left, self.capacities, self.resources)
+            self.pairs.extend(paired)
+            left = without(left, [i for p in paired for i in p])
+            if not free and not fixed and not paired: break
+
+        self.tbin = Bin([self.capacities[r] for r in self.resources])
+        self.items = []
+        self.mapping = {} # id(reduced item) -> original item
+        for i in left:
+            ri = Item([i.requirements[r] for r in self.resources])
+            self.items.append(ri)
+            self.mapping[id(ri)] = i
+
+    def __repr__(self):
+        return "Reduction(%d items, %d resources, %d fixed, %d pairs, %d free)" % (
+            len(self.items), len(self.resources), len(self.fixed),
+            len(self.pairs), len(self.free))
+
+    def restore(self, solution):
+        """ Return the solution of the original instance built from
+        solution, a solution of the reduced instance (None if solution
+        is None). Fixed items and pairs get their own bins, and free items
+        are put into the first bin they fit into """
+        if solution is None: return None
+        bins = []
+        for b in solution.bins:
+            nb = Bin(self.capacities)
+            for i in b.items:
+                nb.insert(self.mapping[id(i)])
+            bins.append(nb)
+        for content in [[i] for i in self.fixed] + self.pairs:
+            nb = Bin(self.capacities)
+            for i in content:
+                nb.insert(i)
+            bins.append(nb)
+        for i in self.free:
+            for b in bins:
+                if b.add(i): break
+            else:
+                nb = Bin(self.capacities)
+                nb.insert(i)
+                bins.append(nb)
+        return Instance(self.original, bins)
@@ -0,0 +1,161 @@
+"""
+Columnar benchmark results (requires numpy to save, load and summarize
+results)
+
+Results are stored with one row per (instance, heuristic) pair, in typed
+columns, and saved as a compressed numpy .npz archive.
+summarize aggregates them into the CSV summaries written by the benchmark.
+"""
+
+
+# (name, type) of the columns
+COLUMNS = [
+    ('instance', int),          # instance number
+    ('name', str),              # instance name (e.g. file name)
+    ('heuristic', str),
+    ('instance_type', str),     # generator configuration
+    ('min_fill', float),
+    ('rem_cons', float),
+    ('dev', float),
+    ('rate', float),
+    ('correlated_items', bool),
+    ('num_bins', int),          # instance characteristics
+    ('num_res', int),
+    ('num_items', int),
+    ('usage', float),
+    ('max_usage', float),
+    ('packed', float),          # ratio of packed items
+    ('success', bool),
+    ('time', float),            # running time (seconds)
+]
+DEFAULTS = {int: 0, float: 0.0, bool: False, str: ''}
+
+
+class ResultsWriter:
+    """ Accumulate results rows. Missing values are set to defaults """
+    def __init__(self):
+        self.columns = dict((n, []) for n, t in COLUMNS)
+        self.num_rows = 0
+
+    def __len__(self):
+        return self.num_rows
+
+    def add(self, **row):
+        """ Add a row """
+        for n, t in COLUMNS:
+            self.columns[n].append(t(row.pop(n, DEFAULTS[t])))
+        if row:
+            raise ValueError("Unknown columns: " + ", ".join(sorted(row)))
+        self.num_rows += 1
+
+    def arrays(self):
+        """ Return the columns as a dict of typed numpy arrays """
+        import numpy as np
+        ret = {}
+        for n, t in COLUMNS:
+            ret[n] = np.array(self.columns[n], dtype=t if t is not str else np.str_)
+        return ret
+
+    def save(self, filename):
+        """ Save the results as a .npz archive """
+        import numpy as np
+        np.savez_compressed(filename, **self.arrays())
+
+
+def load_results(filename):
+    """ Load results saved by ResultsWriter.save.
+    Return a dict of numpy arrays """
+    import numpy as np
+    data = np.load(filename)
+    try:
+        return dict((n, data[n]) for n, t in COLUMNS)
+    finally:
+        data.close()
+
+
+def first_seen(values):
+    """ Return the distinct values in the order of their first occurrence,
+    and the index of each value in this list (numpy arrays) """
+    import numpy as np
+    uniq, first, inverse = np.unique(values, return_index=True,
+                                     return_inverse=True)
+    order = np.argsort(first, kind='mergesort')
+    rank = np.empty(len(order), dtype=int)
+    rank[order] = np.arange(len(order))
+    return uniq[order], rank[inverse]
+
+def summarize(results):
+    """
+    Aggregate results in the format of the benchmark CSV files:
+        #bins ; #resources; Avg #items ; Avg %usage ; Avg max % usage;
+        followed by heu_pn;heu_ns; for each heuristic
+    (average ratio of packed items and number of successes).
+    There is one line per configuration and number of bins and resources.
+    Rows are grouped with numpy (np.unique and np.bincount).
+
+    Return the header and the list of lines
+    """
+    import numpy as np
+    keys = ('instance_type', 'min_fill', 'rem_cons', 'dev', 'rate',
+            'correlated_items', 'num_bins', 'num_res')
+    heuristics, heu = first_seen(np.asarray(results['heuristic']))
+
+    header = '#bins ; #resources; Avg #items ; Avg %usage ; Avg max % usage;'
+    for h in heuristics:
+        header += str(h)+'_pn;'+str(h)+'_ns;'
+    if not len(heu):
+        return header, []
+
+    # Group number of each row: one group per distinct key
+    code = np.zeros(len(heu), dtype=np.int64)
+    for k in keys:
+        uniq, inverse = np.unique(np.asarray(results[k]), return_inverse=True)
+        code = code * len(uniq) + inverse
+    codes, group = first_seen(code)
+    ng, nh = len(codes), len(heuristics)
+    first = np.unique(group, return_index=True)[1] # first row of each group
+
+    def totals(column, rows, cells, size):
+        return np.bincount(cells, weights=np.asarray(results[column])[rows],
+                           minlength=size)
+
+    # Instance characteristics are repeated for all heuristics:
+    # the last row of each instance of a group is kept
+    instances = np.unique(np.asarray(results['instance']), return_inverse=True)[1]
+    pairs = (group * (instances.max() + 1) + instances)[::-1]
+    rows = len(pairs) - 1 - np.unique(pairs, return_index=True)[1]
+    n = np.bincount(group[rows], minlength=ng)
+    ni = totals('num_items', rows, group[rows], ng)
+    usg = totals('usage', rows, group[rows], ng)
+    max_usg = totals('max_usage', rows, group[rows], ng)
+
+    # Results of the heuristics, per group and heuristic
+    cells = group * nh + heu
+    rows = np.arange(len(cells))
+    count = np.bincount(cells, minlength=ng*nh)
+    packed = totals('packed', rows, cells, ng*nh)
+    success = totals('success', rows, cells, ng*nh)
+
+    lines = []
+    for g in xrange(ng):
+        r = first[g]
+        s = str(results['num_bins'][r]) + ';' + str(results['num_res'][r]) + ';'
+        s += str(int(ni[g]) // int(n[g])) + ";" + str(float(usg[g] / n[g])) + \
+            ";" + str(float(max_usg[g] / n[g])) + ";"
+        for c in xrange(g*nh, (g+1)*nh):
+            if not count[c]:
+                s += ';;'
+                continue
+            s += str(float(packed[c] / count[c])) + ';' + str(int(success[c])) + ';'
+        lines.append(s)
+
+    return header, lines
+
+
+def write_summary(results, filename):
+    """ Write the CSV summary of results into filename """
+    header, lines = summarize(results)
+    with open(filename, 'w') as f:
+        f.write(header+'\n')
+        for l in lines:
+            f.write(l+'\n')
@@ -0,0 +1,304 @@
+"""
+Long-running solver service
+
+A server listens on a Unix socket (or a localhost TCP port) and solves the
+instances it receives with solver.optimize, on a pool of worker processes
+started once. Workers keep their code loaded and their FeasibilityCache
+between requests, so a request does not pay the interpreter startup.
+
+Protocol (a connection may send any number of requests):
+    request     a header line "<format> <length> [option ...]" followed by
+                a payload of length bytes.
+                format is "arcflow" (the text format of vbp-optim) or
+                "binary": little-endian uint32 #resources and #items, then
+                int32 capacities of the typical bin and requirements of
+                the items. Options are "dp", "ls" and "exact" (see optimize)
+    response    one JSON line: {"bins": number of bins, "packing": list of
+                the lists of the items (indices) of each bin, "time": solving
+                time in seconds} or {"error": message}. "bins" and "packing"
+                are null if no solution was found (e.g. an item does not fit
+                into the bin)
+
+Requests arriving together (within delay seconds, up to batch_size requests)
+are dispatched to the pool in a single batch. Each worker keeps the results
+of the last CACHE_SIZE instances it solved; failures are only reused by
+requests with the same options. If a batch raises or does not finish within
+timeout seconds (e.g. a worker died), its requests get an error response.
+A header announcing a negative length or a payload larger than max_payload
+bytes is answered with an error before anything is read.
+"""
+
+import json
+import struct
+import threading
+import time
+
+try:
+    import SocketServer as socketserver
+    import Queue as queue
+except ImportError:
+    import socketserver
+    import queue
+
+from .container import Item, Bin
+
+FORMATS = ("arcflow", "binary")
+OPTIONS = ("dp", "ls", "exact")
+BINARY_HEADER = "<II"
+CACHE_SIZE = 256 # number of instances kept in the cache of a worker
+TIMEOUT = 600 # seconds a batch may run before its requests are answered with an error
+MAX_PAYLOAD = 64 << 20 # largest payload (bytes) accepted by default
+
+
+################## Instances ####################
+
+def parse_arcflow(text):
+    """ Parse an instance in the arc-flow format (see scripts/vbp-optim.py).
+    Return the requirements of the items and the capacities of the typical bin """
+    lines = [l.split() for l in text.splitlines() if l.strip()]
+    dim = int(lines[0][0])
+    cap = [int(x) for x in lines[1]]
+    if len(cap) != dim or int(lines[2][0]) != len(lines) - 3:
+        raise ValueError("invalid arc-flow instance")
+    reqs = []
+    for l in lines[3:]:
+        req = [int(x) for x in l]
+        if len(req) != dim + 1:
+            raise ValueError("invalid arc-flow instance")
+        reqs.extend([req[:dim]] * req[dim])
+    return reqs, cap
+
+def pack_binary(reqs, cap):
+    """ Return the binary payload of an instance """
+    data = [len(cap), len(reqs)] + list(cap) + [x for r in reqs for x in r]
+    return struct.pack(BINARY_HEADER + "%di" % (len(data) - 2), *data)
+
+def parse_binary(data):
+    """ Parse a binary payload.
+    Return the requirements of the items and the capacities of the typical bin """
+    nr, ni = struct.unpack_from(BINARY_HEADER, data)
+    size = struct.calcsize(BINARY_HEADER)
+    if len(data) != size + 4*nr*(ni+1):
+        raise ValueError("invalid binary instance")
+    values = struct.unpack_from("<%di" % (nr*(ni+1)), data, size)
+    cap = list(values[:nr])
+    reqs = [list(values[nr*(k+1):nr*(k+2)]) for k in xrange(ni)]
+    return reqs, cap
+
+
+################## Workers ####################
+
+cache = None # FeasibilityCache of the worker process
+
+def init_worker():
+    """ Load the solver in a worker and run it once.
+    Interruptions are left to the server process """
+    global cache
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from . import solver
+    cache = solver.FeasibilityCache(CACHE_SIZE)
+    solver.optimize([Item([1, 1])], Bin([1, 1]))
+
+def solve_job(job):
+    """ Solve a job (reqs, cap, options) in a worker.
+    Return the response (a dict) """
+    from . import solver
+    reqs, cap, options = job
+    try:
+        t = time.time()
+        items = [Item(r) for r in reqs]
+        ret = solver.optimize(items, Bin(cap), "dp" in options, None,
+                              "ls" in options, "exact" in options, cache)
+        if ret is None:
+            return {"bins": None, "packing": None, "time": time.time()-t}
+        index = dict((id(i), k) for k, i in enumerate(items))
+        packing = [[index[id(i)] for i in b.items] for b in ret.bins]
+        return {"bins": len(packing), "packing": packing, "time": time.time()-t}
+    except Exception as e:
+        return {"error": "%s: %s" % (type(e).__name__, e)}
+
+
+class Job:
+    """ A request waiting for its response """
+    def __init__(self, args):
+        self.args = args
+        self.response = None
+        self.done = threading.Event()
+
+    def wait(self):
+        self.done.wait()
+        return self.response
+
+
+class Dispatcher:
+    """ Send the jobs to a pool of processes, by batches:
+    up to batch_size jobs submitted within delay seconds.
+    A batch which is not done after timeout seconds is answered with errors """
+    def __init__(self, processes=None, batch_size=32, delay=.005, timeout=TIMEOUT):
+        import multiprocessing
+        self.pool = multiprocessing.Pool(processes, init_worker)
+        self.batch_size = batch_size
+        self.delay = delay
+        self.timeout = timeout
+        self.jobs = queue.Queue()
+        self.batches = 0
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, args):
+        """ Solve a job. Return its response """
+        job = Job(args)
+        self.jobs.put(job)
+        return job.wait()
+
+    def run(self):
+        while True:
+            batch = [self.jobs.get()]
+            if batch[0] is None: return
+            end = time.time() + self.delay
+            while len(batch) < self.batch_size:
+                try:
+                    job = self.jobs.get(timeout=max(end - time.time(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    self.jobs.put(None)
+                    break
+                batch.append(job)
+            self.batches += 1
+            result = self.pool.map_async(solve_job, [j.args for j in batch], 1)
+            waiter = threading.Thread(target=self.wait, args=(batch, result))
+            waiter.daemon = True
+            waiter.start()
+
+    def wait(self, batch, result):
+        """ Answer the jobs of a batch once its result is available """
+        import multiprocessing
+        try:
+            responses = result.get(self.timeout)
+        except multiprocessing.TimeoutError:
+            responses = [{"error": "timeout"}] * len(batch)
+        except Exception as e:
+            responses = [{"error": "%s: %s" % (type(e).__name__, e)}] * len(batch)
+        self.answer(batch, responses)
+
+    def answer(self, batch, responses):
+        for job, response in zip(batch, responses):
+            job.response = response
+            job.done.set()
+
+    def close(self):
+        self.jobs.put(None)
+        self.thread.join()
+        self.pool.terminate()
+        self.pool.join()
+
+
+################## Server ####################
+
+class Handler(socketserver.StreamRequestHandler):
+    """ Answer the requests of a connection """
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line: return
+            try:
+                fmt, length, options = self.parse_header(line)
+                payload = self.rfile.read(length)
+                if len(payload) != length:
+                    raise ValueError("truncated payload")
+                if fmt == "arcflow":
+                    reqs, cap = parse_arcflow(payload.decode('ascii'))
+                else:
+                    reqs, cap = parse_binary(payload)
+            except (ValueError, IndexError, struct.error) as e:
+                response = {"error": "invalid request: %s" % e}
+            else:
+                response = self.server.dispatcher.submit((reqs, cap, options))
+            self.wfile.write((json.dumps(response) + "\n").encode('ascii'))
+            self.wfile.flush()
+
+    def parse_header(self, line):
+        words = line.decode('ascii').split()
+        if len(words) < 2 or words[0] not in FORMATS:
+            raise ValueError("bad header")
+        for o in words[2:]:
+            if o not in OPTIONS: raise ValueError("unknown option " + o)
+        length = int(words[1])
+        if length < 0 or length > self.server.max_payload:
+            raise ValueError("bad length")
+        return words[0], length, tuple(words[2:])
+
+
+class TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(address, processes=None, batch_size=32, delay=.005,
+                timeout=TIMEOUT, max_payload=MAX_PAYLOAD):
+    """
+    Return a server listening on address: the path of a Unix socket,
+    or a tuple (host, port). Start it with serve_forever() and stop it
+    with shutdown() then close_server().
+
+    Keyword arguments:
+        processes -- number of worker processes (None uses all cores)
+        batch_size -- max number of requests dispatched together
+        delay -- how long (in seconds) the dispatcher waits for requests
+            to add to a batch
+        timeout -- how long (in seconds) a batch may run before its
+            requests are answered with an error
+        max_payload -- largest payload (in bytes) of a request
+    """
+    if isinstance(address, tuple):
+        server = TCPServer(address, Handler)
+    else:
+        server = UnixServer(address, Handler)
+    server.max_payload = max_payload
+    server.dispatcher = Dispatcher(processes, batch_size, delay, timeout)
+    return server
+
+def close_server(server):
+    """ Close the socket and stop the workers of a server """
+    server.server_close()
+    server.dispatcher.close()
+
+
+################## Client ####################
+
+class Client:
+    """ A connection to a server """
+    def __init__(self, address):
+        import socket
+        if isinstance(address, tuple):
+            self.sock = socket.create_connection(address)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(address)
+        self.file = self.sock.makefile('rwb')
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def request(self, fmt, payload, options=()):
+        """ Send a request. Return the response (a dict) """
+        header = "%s %d %s\n" % (fmt, len(payload), " ".join(options))
+        self.file.write(header.encode('ascii') + payload)
+        self.file.flush()
+        return json.loads(self.file.readline().decode('ascii'))
+
+    def optimize(self, items, tbin, options=()):
+        """ Solve the instance (items, tbin), see solver.optimize """
+        reqs = [i.requirements for i in items]
+        return self.request("binary", pack_binary(reqs, tbin.capacities), options)
+
+    def optimize_arcflow(self, text, options=()):
+        """ Solve an instance given in the arc-flow format """
+        return self.request("arcflow", text.encode('ascii'), options)
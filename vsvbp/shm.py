@@ -0,0 +1,145 @@
+"""
+Shared-memory transfer of instances to worker processes
+
+An instance (requirements of the items and capacities of the bins) is
+published once as a block:
+    #items, #bins, #resources, type, requirements, capacities
+The values are stored as int32 ('i'), int64 ('l') or doubles ('d'),
+whichever holds all of them exactly. Other instances are pickled.
+Tasks only carry the name of the block. Workers attach to it by name and
+build their own Items and Bins.
+
+Blocks use multiprocessing.shared_memory when it is available (Python 3.8+),
+and a file in /dev/shm (memory-backed on Linux) otherwise. multiprocessing
+is only imported when a block is created or attached.
+"""
+
+import array
+import mmap
+import os
+import struct
+
+HEADER = "<4i"
+TYPES = "ildp" # typecodes of the values, 'p' stands for pickled
+HEADER_SIZE = struct.calcsize(HEADER)
+PREFIX = "shm:" # names of multiprocessing.shared_memory blocks
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+MAX_ATTACHED = 8 # number of instances kept by a worker
+
+attached = {} # name -> (requirements, capacities), in a worker
+
+
+def shared_memory():
+    """ Return the multiprocessing.shared_memory module, None if it is
+    not available """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        return None
+    return shared_memory
+
+
+def typecode(values):
+    """ Return the typecode of TYPES storing values exactly """
+    if all(isinstance(x, (int, long)) for x in values):
+        for code in "il":
+            bound = 2 ** (8*array.array(code).itemsize - 1)
+            if all(-bound <= x < bound for x in values):
+                return code
+    elif all(isinstance(x, float) or (isinstance(x, (int, long)) and
+             abs(x) <= 2**53) for x in values):
+        return 'd'
+    return 'p'
+
+def encode(requirements, capacities):
+    """ Return the block of an instance, as bytes """
+    nr = len(capacities[0]) if capacities else 0
+    values = ([x for r in requirements for x in r] +
+              [x for c in capacities for x in c])
+    code = typecode(values)
+    if code == 'p':
+        import pickle
+        data = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+    else:
+        values = array.array(code, values)
+        data = (getattr(values, 'tobytes', None) or values.tostring)()
+    header = struct.pack(HEADER, len(requirements), len(capacities), nr,
+                         TYPES.index(code))
+    return header + data
+
+def decode(data):
+    """ Return the requirements and capacities stored in a block """
+    ni, nb, nr, code = struct.unpack_from(HEADER, data)
+    code = TYPES[code]
+    if code == 'p':
+        import pickle
+        values = pickle.loads(bytes(data[HEADER_SIZE:]))
+    else:
+        values = array.array(code)
+        size = values.itemsize*nr*(ni+nb)
+        chunk = bytes(data[HEADER_SIZE:HEADER_SIZE + size])
+        (getattr(values, 'frombytes', None) or values.fromstring)(chunk)
+        values = values.tolist()
+    reqs = [values[nr*k:nr*(k+1)] for k in xrange(ni)]
+    caps = [values[nr*k:nr*(k+1)] for k in xrange(ni, ni+nb)]
+    return reqs, caps
+
+
+class SharedInstance:
+    """ An instance published in shared memory. The publisher must call
+    unlink() when workers do not need it anymore """
+    def __init__(self, requirements, capacities):
+        data = encode(requirements, capacities)
+        module = shared_memory()
+        if module is not None:
+            self.block = module.SharedMemory(create=True, size=len(data))
+            self.block.buf[:len(data)] = data
+            self.name = PREFIX + self.block.name
+        else:
+            import tempfile
+            fd, self.name = tempfile.mkstemp(prefix="vsvbp-", dir=SHM_DIR)
+            os.write(fd, data)
+            os.close(fd)
+
+    def __repr__(self):
+        return "SharedInstance(" + self.name + ")"
+
+    def unlink(self):
+        """ Release the block """
+        if self.name.startswith(PREFIX):
+            self.block.close()
+            self.block.unlink()
+        else:
+            os.remove(self.name)
+
+
+def attach(name):
+    """ Return the requirements and capacities of a published instance.
+    Instances are read once per process """
+    if name in attached:
+        return attached[name]
+    if name.startswith(PREFIX):
+        block = shared_memory().SharedMemory(name=name[len(PREFIX):])
+        try:
+            ret = decode(block.buf)
+        finally:
+            block.close()
+    else:
+        with open(name, 'rb') as f:
+            block = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                ret = decode(block)
+            finally:
+                block.close()
+    if len(attached) >= MAX_ATTACHED:
+        attached.clear()
+    attached[name] = ret
+    return ret
+
+
+def load(source):
+    """ Return the requirements and capacities of source: a published
+    instance name or a tuple (requirements, capacities) """
+    if isinstance(source, tuple):
+        return source
+    return attach(source)
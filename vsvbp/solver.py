@@ -4,12 +4,30 @@
     This is not exact and neither run-time optimized
 """
 
-from .container import *
-from .heuristics import *
-from .generator import *
-from .measures import *
+import collections
+import itertools
 import random
 
+from .container import Item, Bin, Instance, vp_lower_bound
+from .heuristics import bfd_item_centric, bfd_bin_centric, bin_balancing, STEPS
+from .measures import (do_nothing, shuffleItems, shuffleBins,
+        shuffleItemsOnce, shuffleBinsOnce,
+        staticItemsOneOverC, staticBinsOneOverC,
+        dynamicItemsOneOverC, dynamicBinsOneOverC,
+        staticItemsOneOverR, staticBinsOneOverR,
+        dynamicItemsOneOverR, dynamicBinsOneOverR,
+        staticItemsROverC, staticBinsROverC,
+        dynamicItemsROverC, dynamicBinsROverC,
+        dp_nonorm, dp_normC, dp_normR, STATIC_ITEM_MEASURES, static_order)
+from .generator import instance_rng
+from .preprocess import Reduction, compatibility_masks
+from .localsearch import local_search
+from .exact import branch_and_bound
+
+EXACT_MAX_ITEMS = 50 # max number of items on which the exact search is run
+EXACT_MAX_GAP = 2 # max gap between the lower bound and the best solution
+RACE_STEPS = 20 # number of iterations of a heuristic in a time slice of a race
+
 ######## Create a list of heuristics with valid combinations of measures ########
 class HeuristicList:
     pass
@@ -18,155 +36,537 @@ __hlist = HeuristicList()
 
 # Static bfd ic/bc heuristics
 __hlist.static = [
-        (do_nothing, do_nothing),
-        (shuffleItemsOnce,shuffleBinsOnce),
-        (staticItemsOneOverC,staticBinsOneOverC),
-        (staticItemsOneOverR,staticBinsOneOverR),
-        (staticItemsROverC,staticBinsROverC)
+        ("nothing", do_nothing, do_nothing),
+        ("shuff1", shuffleItemsOnce,shuffleBinsOnce),
+        ("1/C", staticItemsOneOverC,staticBinsOneOverC),
+        ("1/R", staticItemsOneOverR,staticBinsOneOverR),
+        ("R/C", staticItemsROverC,staticBinsROverC)
         ]
 
 # Dynamic heuristics
 __hlist.dynamic = [
-        (shuffleItems,shuffleBins),
-        (dynamicItemsOneOverC,dynamicBinsOneOverC),
-        (dynamicItemsOneOverR,dynamicBinsOneOverR),
-        (dynamicItemsROverC,dynamicBinsROverC)
+        ("shuff", shuffleItems,shuffleBins),
+        ("dyn_1/C", dynamicItemsOneOverC,dynamicBinsOneOverC),
+        ("dyn_1/R", dynamicItemsOneOverR,dynamicBinsOneOverR),
+        ("dyn_R/C", dynamicItemsROverC,dynamicBinsROverC)
         ]
 
 # Bin balancing heuristics
 __hlist.balance = [
-        (do_nothing, do_nothing),
-        (shuffleItemsOnce,shuffleBinsOnce),
-        (shuffleItems,shuffleBins),
-        (staticItemsOneOverC,staticBinsOneOverC),
-        (dynamicItemsOneOverC,dynamicBinsOneOverC),
-        (staticItemsOneOverR,staticBinsOneOverR),
-        (dynamicItemsOneOverR,dynamicBinsOneOverR),
-        (staticItemsROverC,staticBinsROverC),
-        (dynamicItemsROverC,dynamicBinsROverC)
+        ("nothing", do_nothing, do_nothing),
+        ("shuff1", shuffleItemsOnce,shuffleBinsOnce),
+        ("shuff", shuffleItems,shuffleBins),
+        ("st_1/C", staticItemsOneOverC,staticBinsOneOverC),
+        ("dyn_1/C", dynamicItemsOneOverC,dynamicBinsOneOverC),
+        ("st_1/R", staticItemsOneOverR,staticBinsOneOverR),
+        ("dyn_1/R", dynamicItemsOneOverR,dynamicBinsOneOverR),
+        ("st_R/C", staticItemsROverC,staticBinsROverC),
+        ("dyn_R/C", dynamicItemsROverC,dynamicBinsROverC)
         ]
 
 # Dot Product heuristics
 __hlist.dotprod = [
-        (dp_nonorm, do_nothing),
-        (dp_normC, do_nothing),
-        (dp_normR, do_nothing)
+        ("dp", dp_nonorm, do_nothing),
+        ("dp_normC", dp_normC, do_nothing),
+        ("dp_normR", dp_normR, do_nothing)
         ]
 
-def is_feasible(instance, use_dp=False):
-    """ Run all heuristics and return True iff a heuristic finds
-    a feasible solution. Return False otherwise.
-
-    We emphasize that this code is NOT optimized at all. We could
-    make each much faster by sarting with the heuristics which have
-    the best success chances."""
-
-    # Run static heuristics
-    for m1, m2 in __hlist.static:
-        instance.empty()
-        ret = bfd_item_centric(instance.items[:], instance.bins[:], m1, m2)
-        if not ret: return True
-
-    # Run item centric dynamic heuristics
-    for m1, m2 in __hlist.dynamic:
-        instance.empty()
-        ret = bfd_item_centric(instance.items[:], instance.bins[:], m1, m2)
-        if not ret: return True
+def portfolio(use_dp=False):
+    """ Return the list of heuristics run by is_feasible, in this order.
+    A heuristic is a tuple (name, heuristic, item_measure, bin_measure, kwargs)
+    Names are the ones used in the benchmark """
+    ret = [(n, bfd_item_centric, m1, m2, {}) for n, m1, m2 in __hlist.static]
+    ret += [("ic_"+n, bfd_item_centric, m1, m2, {}) for n, m1, m2 in __hlist.dynamic]
+    ret += [("bc_"+n, bfd_bin_centric, m1, m2, {}) for n, m1, m2 in __hlist.dynamic]
+    ret += [("bb_"+n, bin_balancing, m1, m2, {}) for n, m1, m2 in __hlist.balance]
+    ret += [("sbb_"+n, bin_balancing, m1, m2, {'single': True})
+            for n, m1, m2 in __hlist.balance]
+    if use_dp:
+        ret += [(n, bfd_item_centric, m1, m2, {}) for n, m1, m2 in __hlist.dotprod]
+    return ret
+
+######## Multi-start ########
+
+def randomized_portfolio():
+    """ Return the randomized item centric and bin balancing heuristics
+    of the portfolio """
+    return [h for h in portfolio() if "shuff" in h[0] and
+            h[1] in (bfd_item_centric, bin_balancing)]
+
+def restart(args):
+    """ Run all randomized heuristics once on an instance, with the random
+    stream of restart r. args = (source, seed, r), source is a tuple
+    (requirements, capacities) or the name of a shared instance (see shm)
+    Return (name, packing) where packing[b] lists the indices of the items
+    in bin b if a heuristic found a solution, None otherwise """
+    from .shm import load
+    source, seed, r = args
+    reqs, caps = load(source)
+    items = [Item(q) for q in reqs]
+    bins = [Bin(c) for c in caps]
+    rng = instance_rng(seed, r)
+    compat = compatibility_masks(items, bins)
+    for name, heuristic, m1, m2, kwargs in randomized_portfolio():
+        inst = Instance(items, bins)
+        inst.empty()
+        if heuristic is not bfd_bin_centric:
+            kwargs = dict(kwargs, compat=compat)
+        if not heuristic(items[:], bins[:], m1, m2, rng=rng, fail_fast=True,
+                         **kwargs):
+            index = dict((id(i), k) for k, i in enumerate(items))
+            return name, [[index[id(i)] for i in b.items] for b in bins]
+    return None
+
+def multi_start(instance, restarts, seed=0, pool=None, processes=1):
+    """ Run restarts randomized restarts of the randomized heuristics,
+    on a pool of processes if pool is provided, and stop at the first success.
+    Restart r only depends on seed and r. On a pool (of the given number
+    of processes), restarts are run by chunks of one restart per process:
+    no restart is left running or queued after the first success.
+
+    Return the name of the heuristic which found a feasible solution,
+    None if no solution was found. The solution is stored in instance.bins """
+    source = ([i.requirements for i in instance.items],
+              [b.capacities for b in instance.bins])
+    shared = None
+    try:
+        if pool is None:
+            results = itertools.imap(restart, ((source, seed, r)
+                                               for r in xrange(restarts)))
+        else:
+            # Workers read the instance from shared memory
+            from .shm import SharedInstance
+            shared = SharedInstance(*source)
+            chunk = max(processes, 1)
+            results = (ret for start in xrange(0, restarts, chunk)
+                       for ret in pool.map(restart, [(shared.name, seed, r)
+                           for r in xrange(start, min(start+chunk, restarts))]))
+        for ret in results:
+            if ret is not None:
+                name, packing = ret
+                instance.empty()
+                for b, content in zip(instance.bins, packing):
+                    for k in content:
+                        b.insert(instance.items[k])
+                return "ms_" + name
+        return None
+    finally:
+        if shared is not None: shared.unlink()
+
+
+######## Racing ########
+
+def race(instance, heuristics=None, rng=None, steps=RACE_STEPS, compat=None):
+    """
+    Interleave heuristics (a list of heuristics, see portfolio) on a single
+    process: in turn, each one runs steps iterations (see heuristics.STEPS)
+    on its own copy of the instance. A heuristic is dropped as soon as it
+    fails to pack an item and the race stops when one of them packs all items.
 
-    # Run bin centric dynamic heuristics
-    for m1, m2 in __hlist.dynamic:
-        instance.empty()
-        ret = bfd_bin_centric(instance.items[:], instance.bins[:], m1, m2)
-        if not ret: return True
+    compat is the result of preprocess.compatibility_masks on the instance,
+    computed here if it is None.
 
-    # Run bin balancing heuristics
-    for m1, m2 in __hlist.balance:
-        instance.empty()
-        ret = bin_balancing(instance.items[:], instance.bins[:], m1, m2)
-        if not ret: return True
-
-    # Run single bin balancing heuristics
-    for m1, m2 in __hlist.balance:
+    Return the name of the winner (None if all heuristics failed) and the
+    number of iterations run by each heuristic (a dict name -> iterations).
+    The solution is stored in instance.bins
+    """
+    if heuristics is None: heuristics = portfolio()
+    if compat is None:
+        compat = compatibility_masks(instance.items, instance.bins)
+    masks, needs = compat
+    racers = []
+    for name, heuristic, m1, m2, kwargs in heuristics:
+        items = [Item(i.requirements) for i in instance.items]
+        bins = [Bin(b.capacities) for b in instance.bins]
+        if heuristic is not bfd_bin_centric:
+            # The masks of the copies are those of the originals
+            if masks is not None:
+                compat = (dict((id(c), masks[id(b)])
+                               for c, b in zip(bins, instance.bins)),
+                          dict((id(c), needs[id(i)])
+                               for c, i in zip(items, instance.items)))
+            kwargs = dict(kwargs, compat=compat)
+        run = STEPS[heuristic](items, bins[:], m1, m2, rng=rng, fail_fast=True,
+                               **kwargs)
+        racers.append((name, run, items, bins))
+
+    progress = dict((r[0], 0) for r in racers)
+    while racers:
+        for racer in racers[:]:
+            name, run, items, bins = racer
+            for k in xrange(steps):
+                try:
+                    failed = next(run)
+                except StopIteration:
+                    # Winner: copy its packing
+                    index = dict((id(i), j) for j, i in enumerate(items))
+                    instance.empty()
+                    for b, rb in zip(instance.bins, bins):
+                        for i in rb.items:
+                            b.insert(instance.items[index[id(i)]])
+                    return name, progress
+                progress[name] += 1
+                if failed:
+                    racers.remove(racer)
+                    break
+    return None, progress
+
+
+def solve(instance, use_dp=False, use_ls=False, first=None, rng=None,
+          restarts=0, pool=None, racing=False, orders=None, processes=1,
+          compat=None):
+    """ Run all heuristics until one of them finds a feasible solution.
+    If first is the name of a heuristic, it is run first.
+    Randomized measures draw their random numbers from rng
+    (a random.Random), or from the random module if rng is None.
+
+    If restarts > 0 and all heuristics fail, the randomized heuristics
+    are restarted (see multi_start), on the given pool of processes
+    (processes is its number of processes).
+
+    If racing is True, the heuristics are interleaved (see race) instead of
+    being run one after the other.
+
+    orders is a dict (static item measure -> items of the instance sorted by
+    decreasing sizes, see measures.static_order) filled and reused by the
+    item centric and bin balancing heuristics using static item measures.
+    It can be shared by calls on the same items with identical bins.
+    compat is the result of preprocess.compatibility_masks on the instance,
+    computed here (once for all heuristics) if it is None.
+
+    Heuristics stop at their first failure (fail_fast), except the item
+    centric ones when use_ls is True and racing is False: if all heuristics
+    fail, the item centric heuristic which packed the largest number of items
+    (ran the largest number of iterations in a race) is run again and
+    the local search tries to pack its unpacked items.
+
+    Return the name of the heuristic which found a feasible solution
+    ("ls" for the local search, "ms_<name>" for restarts), None if no
+    solution was found. The solution is stored in instance.bins """
+    heuristics = portfolio(use_dp)
+    for k, h in enumerate(heuristics):
+        if h[0] == first:
+            heuristics.insert(0, heuristics.pop(k))
+    if compat is None:
+        compat = compatibility_masks(instance.items, instance.bins)
+
+    best = None # item centric heuristic with the fewest unpacked items
+    if racing:
+        # The first heuristic is run alone before the race
+        if heuristics[0][0] == first:
+            name, heuristic, m1, m2, kwargs = heuristics.pop(0)
+            instance.empty()
+            if heuristic is not bfd_bin_centric:
+                kwargs = dict(kwargs, compat=compat)
+            if not heuristic(instance.items[:], instance.bins[:], m1, m2,
+                             rng=rng, fail_fast=True, **kwargs):
+                return name
+        name, progress = race(instance, heuristics, rng, compat=compat)
+        if name is not None: return name
+        for name, heuristic, m1, m2, kwargs in heuristics:
+            if heuristic is bfd_item_centric and \
+               (best is None or progress[name] > best[0]):
+                best = (progress[name], m1, m2)
+        heuristics = []
+
+    for name, heuristic, m1, m2, kwargs in heuristics:
         instance.empty()
-        ret = bin_balancing(instance.items[:], instance.bins[:], m1, m2, single=True)
-        if not ret: return True
-
-    # Run Dot Product heuristics
-    if not use_dp:
-        return False
-
-    for m1, m2 in __hlist.dotprod:
+        # the local search needs all unpacked items of item centric runs
+        fail_fast = not (use_ls and heuristic is bfd_item_centric)
+        items = instance.items
+        if heuristic is not bfd_bin_centric:
+            kwargs = dict(kwargs, compat=compat)
+        if orders is not None and m1 in STATIC_ITEM_MEASURES and \
+           heuristic is not bfd_bin_centric:
+            if m1 not in orders:
+                orders[m1] = static_order(instance.items, instance.bins, m1)
+            items = orders[m1]
+            kwargs = dict(kwargs, presorted=True)
+        ret = heuristic(items[:], instance.bins[:], m1, m2, rng=rng,
+                        fail_fast=fail_fast, **kwargs)
+        if not ret: return name
+        if heuristic is bfd_item_centric and (best is None or len(ret) < best[0]):
+            best = (len(ret), m1, m2)
+
+    # Randomized restarts
+    if restarts > 0:
+        seed = (random if rng is None else rng).getrandbits(32)
+        name = multi_start(instance, restarts, seed, pool, processes)
+        if name is not None: return name
+
+    # Try to improve the best partial packing
+    if use_ls and best is not None:
         instance.empty()
-        ret = bfd_item_centric(instance.items[:], instance.bins[:], m1, m2)
-        if not ret: return True
+        ret = bfd_item_centric(instance.items[:], instance.bins[:], best[1], best[2], rng,
+                               compat=compat)
+        if not local_search(instance.bins, ret): return "ls"
 
     # No solution found
-    return False
+    return None
 
+def is_feasible(instance, use_dp=False, use_ls=False, rng=None, racing=False):
+    """ Run all heuristics and return True iff a heuristic finds
+    a feasible solution. Return False otherwise.
+    See solve for more details.
 
-def optimize(items, tbin, use_dp=False, seed=None):
+    We emphasize that this code is NOT optimized at all. We could
+    make each much faster by sarting with the heuristics which have
+    the best success chances."""
+    return solve(instance, use_dp, use_ls, rng=rng, racing=racing) is not None
+
+
+######## Parallel probing ########
+
+def probe(args):
+    """ Check whether k bins are enough, in a worker process.
+    args = (source, k, seed, use_dp, use_ls, first, restarts, racing),
+    source is the name of a shared instance (see shm) whose single bin is
+    the typical bin. Randomized measures use the random stream of k.
+    Return (k, name of the successful heuristic or None, packing) where
+    packing[b] lists the indices of the items in bin b """
+    from .shm import load
+    source, k, seed, use_dp, use_ls, first, restarts, racing = args
+    reqs, caps = load(source)
+    items = [Item(r) for r in reqs]
+    inst = Instance(items, [Bin(caps[0]) for j in xrange(k)])
+    name = solve(inst, use_dp, use_ls, first, instance_rng(seed, k),
+                 restarts, racing=racing)
+    if name is None: return k, None, None
+    index = dict((id(i), j) for j, i in enumerate(items))
+    return k, name, [[index[id(i)] for i in b.items] for b in inst.bins]
+
+def probe_points(lb, ub, p):
+    """ Return at most p numbers of bins splitting [lb ; ub] in p+1 parts """
+    n = ub - lb + 1
+    if n <= p: return range(lb, ub+1)
+    return sorted(set(lb + j*n // (p+1) for j in xrange(1, p+1)))
+
+
+######## Feasibility cache ########
+
+def cache_options(use_dp=False, use_ls=False, restarts=0, racing=False):
+    """ Return the options of optimize which change the outcome of a
+    feasibility check (the key of the failures in a CacheEntry) """
+    return (bool(use_dp), bool(use_ls), restarts, bool(racing))
+
+
+class CacheEntry:
+    """ The results of the feasibility checks on an instance.
+    A success with k bins implies a success with k' > k bins, and if all
+    heuristics fail with k bins, we assume they also fail with k' < k bins.
+    Failures are kept per set of options (see cache_options): a failure
+    of a weaker run says nothing about a stronger one. Successes are
+    valid for any options.
+
+    Solutions are stored as lists of requirements: they can be rebuilt with
+    any list of items having the same requirements.
+    """
+    def __init__(self):
+        self.results = {} # (k, options) -> name of the successful heuristic or None
+        self.best = None # smallest number of bins of a known solution
+        self.packing = None # this solution
+        self.name = None # and the heuristic which found it
+        self.fails = {} # options -> largest number of bins on which all heuristics failed
+        self.infeasible = -1 # largest number of bins proven to be not enough
+
+    def __repr__(self):
+        return str(self.results)
+
+    def max_fail(self, options=cache_options()):
+        """ Return the largest number of bins on which all heuristics
+        failed with the given options (-1 if there is none) """
+        return self.fails.get(options, -1)
+
+    def lookup(self, k, options=cache_options()):
+        """ Return True (resp. False) if we know k bins are (resp. are not)
+        enough, None otherwise """
+        if self.best is not None and self.best <= k: return True
+        if self.max_fail(options) >= k: return False
+        return None
+
+    def record(self, k, name, bins=None, options=cache_options()):
+        """ Record the result of a feasibility check with k bins. name is the
+        heuristic which found a solution (None if there is no solution).
+        bins is the solution """
+        self.results[(k, options)] = name
+        if name is None:
+            self.fails[options] = max(self.max_fail(options), k)
+        elif self.best is None or k < self.best:
+            self.best = k
+            self.name = name
+            self.packing = [[tuple(i.requirements) for i in b.items] for b in bins]
+
+    def solution(self, items, tbin, k):
+        """ Return an instance with k bins containing the known solution,
+        using the given items. Requires: lookup(k) is True """
+        avail = {}
+        for i in items:
+            avail.setdefault(tuple(i.requirements), []).append(i)
+        bins = [Bin(tbin.capacities) for j in xrange(k)]
+        for b, content in zip(bins, self.packing):
+            for r in content:
+                b.insert(avail[r].pop())
+        return Instance(items[:], bins)
+
+
+class FeasibilityCache:
+    """ Memorize the results of the feasibility checks performed by optimize.
+    The same cache can be given to several calls to optimize: results
+    obtained on an instance are reused by all calls on the same instance
+    (same item requirements and bin capacities).
+    If size is set, at most size instances are kept: the least recently
+    used one is dropped first """
+    def __init__(self, size=None):
+        self.entries = collections.OrderedDict()
+        self.size = size
+
+    def __len__(self):
+        return len(self.entries)
+
+    def entry(self, items, tbin):
+        """ Return the entry of the given instance """
+        key = (tuple(tbin.capacities),
+               tuple(sorted(tuple(i.requirements) for i in items)))
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            entry = CacheEntry()
+            if self.size is not None and len(self.entries) >= self.size:
+                self.entries.popitem(last=False)
+        self.entries[key] = entry
+        return entry
+
+
+def optimize(items, tbin, use_dp=False, seed=None, use_ls=False, exact=False,
+             cache=None, restarts=0, processes=1, racing=False, probes=1,
+             reduction=False):
     """ Performs a binary search and returns the best solution
         found for the vector bin packing problem.
 
     Keyword arguments:
         items -- a list of items (Item) to pack
         tbin -- a typical Bin: all bins have the same capacities as tbin
+        use_dp -- if True, run dot product heuristics as well
+        seed -- if set, the random module is seeded with this value
+        use_ls -- if True, run the local search when all heuristics fail
+        exact -- if True, there are at most EXACT_MAX_ITEMS items and the gap
+            between the lower bound and the best solution found by the
+            heuristics is at most EXACT_MAX_GAP, the branch and bound tries
+            to close this gap
+        cache -- a FeasibilityCache. Known results are not computed again
+            and the heuristic which found the best known solution is run first
+        restarts -- number of randomized restarts run when all heuristics
+            fail (see multi_start)
+        processes -- number of processes running the restarts
+            (None uses all cores)
+        racing -- if True, the heuristics are interleaved (see race)
+        probes -- number of numbers of bins checked at once, on a pool of
+            probes processes. Each round splits the search interval in
+            probes+1 parts. Restarts then run in the probing processes
+        reduction -- if True, the instance is reduced first (see
+            preprocess.Reduction), and the reduced instance is solved.
+            An instance with an item which fits into no bin is
+            immediately reported as infeasible
 
     Return the best solution found. len(ret.bins) is the best number of bins found.
     """
     # replace by the following line to return lower bounds
     # return Instance([], [tbin]*vp_lower_bound(items, tbin))
 
+    if reduction:
+        red = Reduction(items, tbin)
+        if red.unpackable: return None
+        if not red.items: return red.restore(Instance([], []))
+        return red.restore(optimize(red.items, red.tbin, use_dp, seed, use_ls,
+                exact, cache, restarts, processes, racing, probes, False))
+
     if seed != None:
         random.seed(seed)
 
-    lb = vp_lower_bound(items, tbin)
-    ub = len(items)
-    best = None
-    while lb <= ub:
-        mid = (lb + ub) / 2
-        bins = [Bin(tbin.capacities) for i in xrange(mid)]
-        inst = Instance(items[:], bins)
-        if is_feasible(inst, use_dp):
-            best = inst
-            ub = mid - 1
-        else:
+    entry = CacheEntry() if cache is None else cache.entry(items, tbin)
+    options = cache_options(use_dp, use_ls, restarts, racing)
+    pool = None
+    if probes > 1 or (restarts > 0 and processes != 1):
+        import multiprocessing
+        processes = probes if probes > 1 else processes or multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes)
+    shared = None
+    try:
+        lb = vp_lower_bound(items, tbin)
+        ub = len(items)
+        best = None
+        # All bins are copies of tbin: static item sizes are only rescaled by
+        # the number of bins, the items are sorted once for all probes
+        orders = {}
+        # Copies of tbin share its compatibility (see solve): no bin is
+        # skipped, unless an item fits into no bin
+        compat = compatibility_masks(items, [tbin])
+        if compat[0] is not None: compat = None
+        if probes > 1:
+            seed = random.getrandbits(32)
+            from .shm import SharedInstance
+            shared = SharedInstance([i.requirements for i in items], [tbin.capacities])
+        while probes > 1 and lb <= ub:
+            results = {}
+            todo = []
+            for k in probe_points(lb, ub, probes):
+                known = entry.lookup(k, options)
+                if known is None: todo.append(k)
+                else: results[k] = known
+            args = [(shared.name, k, seed, use_dp, use_ls, entry.name, restarts,
+                     racing) for k in todo]
+            for k, name, packing in pool.imap_unordered(probe, args):
+                bins = [Bin(tbin.capacities) for j in xrange(k)]
+                for b, content in zip(bins, packing or []):
+                    for j in content:
+                        b.insert(items[j])
+                entry.record(k, name, bins, options)
+                results[k] = name is not None
+            ok = [k for k in results if results[k]]
+            if ok:
+                ub = min(ok) - 1
+                best = entry.solution(items, tbin, ub + 1)
+            lb = max([lb] + [k + 1 for k in results if not results[k] and k <= ub])
+        if shared is not None:
+            shared.unlink()
+            shared = None
+
+        while lb <= ub:
+            mid = (lb + ub) / 2
+            known = entry.lookup(mid, options)
+            if known:
+                best = entry.solution(items, tbin, mid)
+                ub = mid - 1
+                continue
+            if known is None:
+                bins = [Bin(tbin.capacities) for i in xrange(mid)]
+                inst = Instance(items[:], bins)
+                name = solve(inst, use_dp, use_ls, entry.name, restarts=restarts,
+                             pool=pool, racing=racing, orders=orders,
+                             processes=processes, compat=compat)
+                entry.record(mid, name, inst.bins, options)
+                if name is not None:
+                    best = inst
+                    ub = mid - 1
+                    continue
             lb = mid + 1
 
-    return best
-
-
-################## Unit tests ####################
-
-class OptimizationTestCase(unittest.TestCase):
-    def setUp(self):
-        self.items = [Item([0,4,3]), Item([1,1,3]), Item([5,2,1]), Item([3,1,7])]
-        self.bins = [Bin([5,5,8]), Bin([8,5,9]), Bin([3,3,5])]
-
-    def testFeasible(self):
-        bins = [Bin(self.bins[0].capacities) for i in xrange(5)]
-        inst = Instance(self.items[:], bins)
-        assert is_feasible(inst, True)
-
-        bins = [Bin(self.bins[0].capacities) for i in xrange(2)]
-        inst = Instance(self.items[:], bins)
-        assert not is_feasible(inst, True)
-
-        # Warning: this test may fail if the heuristics perform poorly
-        bins = [Bin(self.bins[1].capacities) for i in xrange(3)]
-        inst = Instance(self.items[:], bins)
-        assert is_feasible(inst, True)
-
-        bins = [Bin(self.bins[2].capacities) for i in xrange(15)]
-        inst = Instance(self.items[:], bins)
-        assert not is_feasible(inst, True)
-
-
-    def testOptimize(self):
-        # Warning: these tests may fail if the heuristics perform poorly
-        assert len(optimize(self.items, self.bins[0], True).bins) == 3
-        assert len(optimize(self.items, self.bins[1], True).bins) == 2
-        assert optimize(self.items, self.bins[2], True) == None
-
-if __name__ == "__main__":
-    unittest.main()
+        if exact and best is not None and len(items) <= EXACT_MAX_ITEMS:
+            lb = vp_lower_bound(items, tbin)
+            if len(best.bins) - lb <= EXACT_MAX_GAP:
+                k = len(best.bins) - 1
+                while k >= lb:
+                    if k <= entry.infeasible: break
+                    status, bins = branch_and_bound(items, tbin, k)
+                    if status == False: entry.infeasible = k
+                    if not status: break
+                    best = Instance(items[:], bins)
+                    entry.record(k, "exact", bins, options)
+                    k -= 1
+
+        return best
+    finally:
+        if shared is not None:
+            shared.unlink()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
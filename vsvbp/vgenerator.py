@@ -0,0 +1,155 @@
+"""
+Vectorized VSVBP instances generators (requires numpy)
+
+These generators follow the same distributions as the ones in generator.py,
+but they generate many instances at once: all bins of all instances are
+filled in lockstep, drawing one candidate item per bin at each step.
+Instances are returned as ArrayInstance objects.
+
+Random numbers are drawn from a numpy.random.RandomState, so the generated
+instances differ from the ones of generator.py for the same seed.
+"""
+
+import numpy as np
+
+from .container import *
+from .generator import MAX_NUM_RES, MAX_RES, MIN_RES, MAX_TRY
+
+
+################## Utility functions ####################
+
+def randints(rng, high):
+    """ Return an array of integers drawn uniformly in [0 ; high],
+    high is an array of integers """
+    return np.floor(rng.random_sample(high.shape) * (high+1)).astype(np.int64)
+
+def perturb(rng, base, dev):
+    """ Return max(0, round(base + exponential(base*dev) - base*dev)) """
+    mean = base*dev
+    return np.maximum(0, np.round(base + rng.exponential(1., base.shape)*mean - mean)).astype(np.int64)
+
+def fill(rng, cap, min_fill, draw, tries=1):
+    """
+    Fill the bins with items until Volume(items) > min_fill.
+    At each step, a candidate item is drawn for each bin which is not full.
+    It is rejected if it is a 0 weighted item or if it does not fit.
+    A bin is full after tries rejected items in a row.
+
+    Keyword arguments:
+        cap -- the capacities of the bins, an array of shape (#bins, #resources)
+        draw -- draw(idx, rem) returns the requirements of candidate items
+            for bins idx, rem is the array of their remaining capacities
+    Return an array of requirements and the array of the bins containing the items.
+    """
+    mf = min(min_fill, 1-1e-15) # helps getting rid of numerical instabilities
+    rem = cap.copy()
+    nz = cap > 0
+    inv = np.where(nz, 1. / np.maximum(cap, 1), 0.)
+    ll = np.maximum(nz.sum(axis=1), 1)
+    vol = np.zeros(len(cap))
+    active = np.ones(len(cap), dtype=bool)
+
+    reqs = []
+    owners = []
+    while active.any():
+        pending = np.flatnonzero(active)
+        for tr in xrange(tries):
+            req = draw(pending, rem[pending])
+            ok = (req.max(axis=1) > 0) & (req <= rem[pending]).all(axis=1)
+            acc = pending[ok]
+            rem[acc] -= req[ok]
+            vol[acc] += (req[ok] * inv[acc]).sum(axis=1) / ll[acc]
+            reqs.append(req[ok])
+            owners.append(acc)
+            pending = pending[~ok]
+            if not len(pending): break
+        active[pending] = False
+        active &= vol < mf
+
+    if not reqs:
+        return np.zeros((0, cap.shape[1]), dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(reqs), np.concatenate(owners)
+
+
+################## Bins generators ####################
+
+def unif_bin(rng, num_bins, num_resources, min_fill, rem_cons=1.0,
+             proc_rate=1.0, minr=MIN_RES, maxr=MAX_RES):
+    """ Vectorized generator.unif_bin: generates num_bins bins.
+    Return the array of capacities, the array of requirements and
+    the array of the bins containing the items """
+    cap = rng.randint(minr, maxr+1, size=(num_bins, num_resources))
+    if proc_rate < 1:
+        cap[rng.random_sample(num_bins) > proc_rate, -1] = 0
+    draw = lambda idx, rem: randints(rng, np.floor(rem_cons*rem))
+    return (cap,) + fill(rng, cap, min_fill, draw)
+
+
+def correlated_capacities(rng, num_bins, num_resources, min_fill, dev=.05,
+                          rem_cons=1.0, correlated_items=False, minr=MIN_RES, maxr=MAX_RES):
+    """ Vectorized generator.correlated_capacities: generates num_bins bins.
+    Return the array of capacities, the array of requirements and
+    the array of the bins containing the items """
+    base = rng.randint(minr, maxr+1, size=(num_bins, 1))
+    cap = perturb(rng, np.repeat(base, num_resources, axis=1), dev)
+    if not correlated_items:
+        draw = lambda idx, rem: randints(rng, np.floor(rem_cons*rem))
+        return (cap,) + fill(rng, cap, min_fill, draw)
+
+    high = np.maximum(np.floor(rem_cons*cap.min(axis=1)), 1)
+    def draw(idx, rem):
+        b = 1 + randints(rng, high[idx]-1)
+        return perturb(rng, np.repeat(b[:, None], num_resources, axis=1), dev)
+    return (cap,) + fill(rng, cap, min_fill, draw, MAX_TRY)
+
+
+def similar_items(rng, num_bins, num_resources, min_fill, base_item, dev=.05,
+                  minr=MIN_RES, maxr=MAX_RES):
+    """ Vectorized generator.similar_items: generates num_bins bins.
+    Return the array of capacities, the array of requirements and
+    the array of the bins containing the items """
+    base = np.array(base_item.requirements, dtype=np.float64)
+    cap = perturb(rng, np.tile(5*base, (num_bins, 1)), dev)
+    draw = lambda idx, rem: perturb(rng, np.tile(base, (len(idx), 1)), dev)
+    return (cap,) + fill(rng, cap, min_fill, draw, MAX_TRY)
+
+
+def similar(rng, num_bins, num_resources, min_fill, dev=.05, minr=MIN_RES, maxr=MAX_RES):
+    """ Vectorized generator.similar: generates num_bins bins.
+    Return the array of capacities, the array of requirements and
+    the array of the bins containing the items """
+    cap = rng.randint(minr, maxr+1, size=(num_bins, num_resources))
+    draw = lambda idx, rem: perturb(rng, cap[idx] / 5., dev)
+    return (cap,) + fill(rng, cap, min_fill, draw, MAX_TRY)
+
+
+################## Instances generator ####################
+
+def generator(num_instances, num_bins, num_resources, min_fill,
+              bin_generator=unif_bin, seed=None, rng=None, **kwargs):
+    """
+    Generates num_instances instances at once, as generator.generator
+    would do. Each instance has num_bins bins.
+    Random numbers are drawn from rng (a numpy.random.RandomState),
+    or from a RandomState seeded with seed if rng is not provided.
+
+    Return a list of ArrayInstance. Their arrays are views of
+    two arrays containing all instances.
+    """
+    assert 0.0 < min_fill <= 1.0
+    assert num_resources < MAX_NUM_RES
+    if rng is None: rng = np.random.RandomState(seed)
+
+    cap, req, owner = bin_generator(rng, num_instances*num_bins,
+                                    num_resources, min_fill, **kwargs)
+
+    # Shuffle bins and items of each instance
+    cap = cap.reshape(num_instances, num_bins, num_resources)
+    perm = np.argsort(rng.random_sample((num_instances, num_bins)), axis=1)
+    cap = cap[np.arange(num_instances)[:, None], perm]
+    inst = owner // num_bins
+    order = np.lexsort((rng.random_sample(len(inst)), inst))
+    req = req[order]
+    splits = np.cumsum(np.bincount(inst, minlength=num_instances))[:-1]
+
+    return [ArrayInstance(r, c) for r, c in zip(np.split(req, splits), cap)]